@@ -0,0 +1,2 @@
+# MidiPlusSmartPadRGBEditor/benchmarks/__init__.py
+# Marks the benchmarks directory as a package so scripts can be run with "python -m benchmarks.<name>".
\ No newline at end of file
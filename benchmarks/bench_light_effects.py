@@ -0,0 +1,104 @@
+# MidiPlusSmartPadRGBEditor/benchmarks/bench_light_effects.py
+#
+# Headless benchmark of the reactive LightEffectsEngine on an emulated SmartPad.
+# Presses random pads (each one starting a ripple and a held glow) until the effect
+# pool is full, then reports how long a tick takes to render at that load, how many
+# pads per tick actually had to be sent, and the tick rate the engine sustained
+# against the device's minimum frame delay. Also measures press-to-light latency:
+# the time from a pad press on an idle engine until the emulated unit shows that pad lit.
+#
+# Run from the project root:  python -m benchmarks.bench_light_effects [--seconds S]
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from core.light_effects_engine import MAX_ACTIVE_EFFECTS, LightEffectsEngine
+from core.smartpad_controller import SmartPadController
+from core.smartpad_emulator import EMULATED_PORT_PREFIX, get_emulated_input, get_emulated_port
+
+PORT_NAME = f"{EMULATED_PORT_PREFIX} Effects"
+
+
+def bench_render(engine: LightEffectsEngine, ticks: int) -> list[float]:
+    """Render times (ms) with the pool kept full; rendered directly, no device output."""
+    rng = random.Random(3)
+    times_ms = []
+    now = time.perf_counter()
+    for tick in range(ticks):
+        for _ in range(4): # Keep pressing so expired effects are replaced
+            engine.on_pad_pressed(rng.randrange(engine.controller.profile.pad_count))
+        now += 0.01
+        began = time.perf_counter()
+        engine.render(now)
+        times_ms.append((time.perf_counter() - began) * 1000.0)
+    return times_ms
+
+
+def measure_press_latency(port_name: str, presses: int) -> list[float]:
+    port = get_emulated_port(port_name)
+    pad_input = get_emulated_input(port_name)
+    latencies_ms = []
+    for n in range(presses):
+        pad = (n * 11) % 64
+        while any(color != "OFF" for color in port.get_state()): # Let the previous effects fade first
+            time.sleep(0.01)
+        time.sleep(0.05) # ...and the engine go idle, so each press is the first after a quiet period
+        pressed = time.perf_counter()
+        pad_input.press(pad)
+        while port.get_state()[pad] == "OFF" and time.perf_counter() - pressed < 1.0:
+            time.sleep(0.0002) # Poll without spinning, which would hold the GIL from the engine and output threads
+        latencies_ms.append((time.perf_counter() - pressed) * 1000.0)
+        pad_input.release(pad)
+    return latencies_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the reactive light effects engine on an emulated SmartPad.")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of the live run (default 3)")
+    args = parser.parse_args()
+
+    controller = SmartPadController()
+    if not controller.connect(PORT_NAME):
+        print("Could not open the emulated SmartPad port.")
+        return 1
+    controller.wait_for_output(5.0)
+    engine = LightEffectsEngine(controller)
+
+    render_ms = bench_render(engine, 500)
+    print(f"Render with {MAX_ACTIVE_EFFECTS} active effects: median {statistics.median(render_ms):.3f} ms, "
+          f"max {max(render_ms):.3f} ms per tick")
+
+    # Live run: the engine ticks at the device's minimum frame delay while pads are pressed
+    min_delay_ms = controller.min_frame_delay_ms()
+    engine.start()
+    pad_input = get_emulated_input(PORT_NAME)
+    rng = random.Random(5)
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end:
+        pad = rng.randrange(64)
+        pad_input.press(pad)
+        time.sleep(0.005)
+        pad_input.release(pad)
+    stats = engine.get_stats()
+    engine.stop()
+    achieved_ms = args.seconds * 1000.0 / max(1, stats["ticks"])
+    print(f"Live run: {stats['ticks']} ticks in {args.seconds:.1f} s (~{achieved_ms:.1f} ms/tick, device minimum "
+          f"{min_delay_ms} ms), mean render {stats['mean_tick_ms']:.3f} ms, "
+          f"{stats['pads_pushed'] / max(1, stats['ticks']):.1f} pads sent per tick, "
+          f"up to {stats['max_active_effects']} effects at once")
+
+    engine.start()
+    latencies_ms = measure_press_latency(PORT_NAME, 20)
+    engine.stop()
+    print(f"Press-to-light latency: median {statistics.median(latencies_ms):.2f} ms, max {max(latencies_ms):.2f} ms")
+
+    controller.disconnect()
+    controller.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
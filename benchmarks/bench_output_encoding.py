@@ -0,0 +1,112 @@
+# MidiPlusSmartPadRGBEditor/benchmarks/bench_output_encoding.py
+#
+# Measures how many pad messages per second the frame encoder can produce,
+# comparing the original per-pad mido.Message construction with the precomputed
+# byte tables in core.smartpad_controller, and (for a looping animation) compiling
+# every frame on every tick with the content-keyed compiled-frame cache.
+# No MIDI hardware is needed: every path writes into a null port, so the numbers
+# are pure Python-side encoding cost.
+#
+# Run from the project root:  python -m benchmarks.bench_output_encoding
+
+import random
+import time
+
+import mido
+
+from core.frame_buffer_cache import FrameBufferCache
+from core.smartpad_controller import (
+    COLOR_TO_VELOCITY, DEFAULT_DEVICE_PROFILE, NOTE_OFF_BYTES, NOTE_ON_BYTES, PAD_COUNT, PAD_GRID_NOTES,
+    TARGET_MIDI_CHANNEL, compile_frame,
+)
+
+FRAMES_TO_ENCODE = 2000
+LOOP_LENGTH = 20 # Distinct frames in the looping-animation case
+
+
+class NullOutput(mido.ports.BaseOutput):
+    """mido output port that discards everything (mimics a non-rtmidi backend)."""
+    def _send(self, msg):
+        pass
+
+
+def make_test_frames(count: int) -> list[list[str]]:
+    rng = random.Random(1234)
+    colors = list(COLOR_TO_VELOCITY.keys())
+    return [[rng.choice(colors) for _ in range(PAD_COUNT)] for _ in range(count)]
+
+
+def encode_legacy(frames: list[list[str]], port: mido.ports.BaseOutput) -> int:
+    """The pre-table path: builds a mido.Message per pad, per frame."""
+    sent = 0
+    for frame in frames:
+        for i in range(64):
+            note = PAD_GRID_NOTES[i // 8][i % 8]
+            port.send(mido.Message('note_off', channel=TARGET_MIDI_CHANNEL, note=note, velocity=0))
+            sent += 1
+        for i in range(64):
+            color = frame[i].upper()
+            if color != "OFF" and color in COLOR_TO_VELOCITY:
+                note = PAD_GRID_NOTES[i // 8][i % 8]
+                port.send(mido.Message('note_on', channel=TARGET_MIDI_CHANNEL, note=note,
+                                       velocity=COLOR_TO_VELOCITY[color]))
+                sent += 1
+    return sent
+
+
+def encode_tables(frames: list[list[str]], raw_send) -> int:
+    """The table path: every message is a lookup into NOTE_OFF_BYTES / NOTE_ON_BYTES."""
+    sent = 0
+    for frame in frames:
+        for data in NOTE_OFF_BYTES:
+            raw_send(data)
+        ons = [NOTE_ON_BYTES[i][color] for i, color in enumerate(frame) if color != "OFF"]
+        for data in ons:
+            raw_send(data)
+        sent += PAD_COUNT + len(ons)
+    return sent
+
+
+def encode_loop(frames: list[list[str]], raw_send, cache: FrameBufferCache | None) -> int:
+    """Per tick: normalize color names, compile the frame, send it. With a cache, repeats are lookups."""
+    sent = 0
+    all_pads = range(PAD_COUNT)
+    for frame in frames:
+        key = tuple(frame)
+        compiled = cache.get(key) if cache is not None else None
+        if compiled is None:
+            target = tuple(name.upper() for name in frame)
+            compiled = compile_frame(all_pads, target, False)
+            if cache is not None:
+                cache.put(key, compiled)
+        for _, data in compiled.first_burst:
+            raw_send(data)
+        for _, data in compiled.follow_ups:
+            raw_send(data)
+        sent += compiled.message_count
+    return sent
+
+
+def run_case(label: str, func, *args) -> None:
+    start = time.perf_counter()
+    sent = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {sent:>9} msgs  {elapsed * 1000:8.1f} ms  {sent / elapsed:>12,.0f} msgs/s")
+
+
+def main() -> None:
+    frames = make_test_frames(FRAMES_TO_ENCODE)
+    port = NullOutput()
+    print(f"Encoding {FRAMES_TO_ENCODE} random 8x8 frames (full refresh: 64 Note Off + N Note On each)\n")
+    run_case("before: mido.Message per pad", encode_legacy, frames, port)
+    run_case("after: byte tables -> mido port", encode_tables, frames, lambda data: port.send(DEFAULT_DEVICE_PROFILE.message_for_bytes[data]))
+    run_case("after: byte tables -> raw bytes (rtmidi)", encode_tables, frames, lambda data: None)
+
+    loop = [frames[i % LOOP_LENGTH] for i in range(FRAMES_TO_ENCODE)]
+    print(f"\nLooping animation: {LOOP_LENGTH} distinct frames, {FRAMES_TO_ENCODE} ticks\n")
+    run_case("compile every tick -> raw bytes", encode_loop, loop, lambda data: None, None)
+    run_case("compiled-frame cache -> raw bytes", encode_loop, loop, lambda data: None, FrameBufferCache())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# MidiPlusSmartPadRGBEditor/benchmarks/bench_output_modes.py
+#
+# Headless benchmark of SmartPadController output modes against the in-process
+# SmartPad emulator (core/smartpad_emulator.py). No MIDI hardware or GUI needed,
+# so it runs on any CI box. For each mode it reports:
+#   throughput - messages/s and frames/s when frames are pushed back-to-back
+#   latency    - time from set_all_pads_from_color_names() to the frame's last message
+#   correctness- whether the emulated pads show every frame exactly (closed loop)
+# Exits with status 1 if any mode shows a wrong frame.
+#
+# Run from the project root:  python -m benchmarks.bench_output_modes [--frames N]
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from core.smartpad_controller import COLOR_TO_VELOCITY, DELTA_RESYNC_ROWS_PER_FRAME, PAD_COUNT, SmartPadController
+from core.smartpad_emulator import EMULATED_PORT_PREFIX, get_emulated_port
+
+PORT_NAME = f"{EMULATED_PORT_PREFIX} Bench"
+CHANGED_PADS_PER_FRAME = 6 # Typical sparse animation step
+FULL_FRAME_EVERY = 10      # Every Nth frame is completely new
+
+
+def make_animation(frame_count: int) -> list[list[str]]:
+    rng = random.Random(42)
+    colors = list(COLOR_TO_VELOCITY.keys())
+    frame = [rng.choice(colors) for _ in range(PAD_COUNT)]
+    frames = []
+    for n in range(frame_count):
+        if n % FULL_FRAME_EVERY == 0:
+            frame = [rng.choice(colors) for _ in range(PAD_COUNT)]
+        else:
+            frame = list(frame)
+            for pad in rng.sample(range(PAD_COUNT), CHANGED_PADS_PER_FRAME):
+                frame[pad] = rng.choice(colors)
+        frames.append(frame)
+    return frames
+
+
+def configure_mode(controller: SmartPadController, mode: str) -> None:
+    controller.delta_mode = mode in ("delta", "delta-nr")
+    controller.direct_overwrite = mode == "direct" # Full refreshes, one message per pad
+    controller.delta_resync_rows = 0 if mode == "delta-nr" else DELTA_RESYNC_ROWS_PER_FRAME # "nr": no resync slice
+    controller.invalidate_device_state()
+
+
+def run_mode(controller: SmartPadController, mode: str, frames: list[list[str]]) -> dict:
+    port = get_emulated_port(PORT_NAME)
+    configure_mode(controller, mode)
+
+    # Closed loop: one frame at a time, check what the emulator shows
+    latencies_ms = []
+    wrong_frames = 0
+    for frame in frames:
+        port.clear_log()
+        submitted = time.perf_counter()
+        controller.set_all_pads_from_color_names(frame, silent=True)
+        controller.wait_for_output(5.0)
+        log = port.get_message_log()
+        if log:
+            latencies_ms.append((log[-1][0] - submitted) * 1000.0)
+        if not port.matches(frame):
+            wrong_frames += 1
+
+    # Open loop: push everything as fast as the caller can, measure delivery rate
+    configure_mode(controller, mode)
+    port.clear_log()
+    start = time.perf_counter()
+    for frame in frames:
+        controller.set_all_pads_from_color_names(frame, silent=True)
+        controller.wait_for_output(5.0) # Keep every frame (the queue would otherwise drop the oldest)
+    elapsed = time.perf_counter() - start
+    message_count = port.message_count()
+
+    return {
+        "mode": mode,
+        "messages_per_frame": message_count / len(frames),
+        "messages_per_second": message_count / elapsed if elapsed else 0.0,
+        "frames_per_second": len(frames) / elapsed if elapsed else 0.0,
+        "latency_median_ms": statistics.median(latencies_ms) if latencies_ms else 0.0,
+        "latency_max_ms": max(latencies_ms) if latencies_ms else 0.0,
+        "wrong_frames": wrong_frames,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SmartPad output modes on the emulator.")
+    parser.add_argument("--frames", type=int, default=500, help="frames per mode (default 500)")
+    parser.add_argument("--gap-ms", type=float, default=1.0, help="inter_command_delay in ms (default 1.0)")
+    args = parser.parse_args()
+
+    controller = SmartPadController()
+    if not controller.connect(PORT_NAME):
+        print("Could not open the emulated SmartPad port.")
+        return 1
+    controller.set_output_rate_limit(0) # Measure the output path itself (connect() resets it to the default)
+    controller.inter_command_delay = args.gap_ms / 1000.0
+    controller.wait_for_output(5.0)
+
+    frames = make_animation(args.frames)
+    print(f"{args.frames} frames per mode, {CHANGED_PADS_PER_FRAME} changed pads/frame, "
+          f"full change every {FULL_FRAME_EVERY} frames, gap {args.gap_ms} ms\n")
+    print(f"{'mode':<8} {'msgs/frame':>10} {'msgs/s':>10} {'frames/s':>9} {'lat med ms':>10} {'lat max ms':>10} {'wrong':>6}")
+    failures = 0
+    for mode in ("full", "delta", "delta-nr", "direct"):
+        r = run_mode(controller, mode, frames)
+        failures += r["wrong_frames"]
+        print(f"{r['mode']:<8} {r['messages_per_frame']:>10.1f} {r['messages_per_second']:>10,.0f} {r['frames_per_second']:>9.1f} "
+              f"{r['latency_median_ms']:>10.2f} {r['latency_max_ms']:>10.2f} {r['wrong_frames']:>6}")
+
+    controller.disconnect()
+    controller.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
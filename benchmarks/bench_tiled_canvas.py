@@ -0,0 +1,94 @@
+# MidiPlusSmartPadRGBEditor/benchmarks/bench_tiled_canvas.py
+#
+# Headless benchmark of a 16x16 TiledCanvas spread over four emulated SmartPads
+# (2x2 wall). Each emulated unit is slowed to a realistic per-message link time
+# (sleeping, so units block in parallel like real MIDI drivers do), and
+# for every frame the time until the whole wall shows it is measured, once with the
+# tiles sent concurrently (TiledCanvas) and once one device after another for comparison.
+# Exits with status 1 if the wall ever shows a wrong frame.
+#
+# Run from the project root:  python -m benchmarks.bench_tiled_canvas [--frames N]
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from core.smartpad_controller import COLOR_TO_VELOCITY
+from core.smartpad_emulator import EMULATED_PORT_PREFIX, get_emulated_port
+from core.tiled_canvas import TiledCanvas, TilingMap
+
+PORT_NAMES = [f"{EMULATED_PORT_PREFIX} Wall {n + 1}" for n in range(4)]
+SECONDS_PER_MESSAGE = 0.0002 # ~5k messages/s per unit, i.e. about 25 ms for a full 8x8 refresh
+
+
+def make_frames(count: int, cells: int) -> list[list[str]]:
+    rng = random.Random(7)
+    colors = list(COLOR_TO_VELOCITY.keys())
+    return [[rng.choice(colors) for _ in range(cells)] for _ in range(count)]
+
+
+def wall_matches(canvas: TiledCanvas, frame: list[str]) -> bool:
+    return all(get_emulated_port(port_name).matches([frame[i] for i in indices])
+               for port_name, indices in canvas.tiling.tile_to_canvas.items())
+
+
+def last_message_time(port_names: list[str]) -> float:
+    return max(log[-1][0] for log in (get_emulated_port(name).get_message_log() for name in port_names) if log)
+
+
+def run(canvas: TiledCanvas, frames: list[list[str]], concurrent: bool) -> tuple[list[float], int]:
+    wall_times_ms = []
+    wrong_frames = 0
+    for frame in frames:
+        for port_name in PORT_NAMES:
+            get_emulated_port(port_name).clear_log()
+        canvas.invalidate() # Every tile gets the frame, so both runs send the same traffic
+        submitted = time.perf_counter()
+        if concurrent:
+            canvas.set_frame(frame)
+            canvas.wait_for_output(5.0)
+        else:
+            for port_name, indices in canvas.tiling.tile_to_canvas.items():
+                controller = canvas.group.get_controller(port_name)
+                controller.set_all_pads_from_color_names([frame[i] for i in indices], silent=True)
+                controller.wait_for_output(5.0)
+        wall_times_ms.append((last_message_time(PORT_NAMES) - submitted) * 1000.0)
+        if not wall_matches(canvas, frame):
+            wrong_frames += 1
+    return wall_times_ms, wrong_frames
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark a 2x2 tiled canvas on emulated SmartPads.")
+    parser.add_argument("--frames", type=int, default=100, help="frames per run (default 100)")
+    args = parser.parse_args()
+
+    canvas = TiledCanvas(TilingMap.grid(PORT_NAMES, tiles_across=2))
+    if len(canvas.connect()) != len(PORT_NAMES):
+        print("Could not open the emulated SmartPad ports.")
+        return 1
+    for port_name in PORT_NAMES:
+        canvas.group.get_controller(port_name).set_output_rate_limit(0)
+        port = get_emulated_port(port_name)
+        port.seconds_per_message = SECONDS_PER_MESSAGE
+        port.sleep_while_sending = True # Units must block like real drivers, not hold the GIL
+    canvas.wait_for_output(5.0)
+
+    frames = make_frames(args.frames, canvas.rows * canvas.cols)
+    print(f"{canvas.rows}x{canvas.cols} canvas on {len(PORT_NAMES)} emulated SmartPads, "
+          f"{SECONDS_PER_MESSAGE * 1e6:.0f} us/message, {args.frames} full frames\n")
+    print(f"{'dispatch':<12} {'wall med ms':>11} {'wall max ms':>11} {'wrong':>6}")
+    failures = 0
+    for label, concurrent in (("sequential", False), ("concurrent", True)):
+        times_ms, wrong = run(canvas, frames, concurrent)
+        failures += wrong
+        print(f"{label:<12} {statistics.median(times_ms):>11.2f} {max(times_ms):>11.2f} {wrong:>6}")
+
+    canvas.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -236,6 +236,14 @@ class SmartPadAnimationModel(QObject):
     def get_current_playback_frame_index(self) -> int:
         return self._playback_frame_index
 
+    def mark_playback_frame_played(self, index: int):
+        """Records that frame index was just output (by a playback scheduler); playback resumes after it."""
+        if not self._is_playing or self.get_frame_count() == 0:
+            return
+        self._playback_frame_index = index + 1
+        if self._playback_frame_index >= self.get_frame_count() and self.loop:
+            self._playback_frame_index = 0
+
     def step_and_get_playback_frame_colors(self) -> list[str] | None:
         if not self._is_playing or self.get_frame_count() == 0:
             self.stop_playback()
@@ -0,0 +1,122 @@
+# MidiPlusSmartPadRGBEditor/core/device_profile.py
+
+import json
+import os
+
+import mido
+
+# Profiles shipped with the app; one JSON file per device
+DEVICE_PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "device_profiles")
+
+
+class DeviceProfile:
+    """
+    Everything device-specific about driving a pad grid over MIDI: grid size, pad -> note map,
+    channel, color -> velocity palette, the port-name keywords used for auto-detection, and
+    whether it accepts a Note On over a lit pad (direct overwrite).
+
+    All messages the device can be sent are compiled once, here, into flat per-pad tables,
+    so the output hot path is an index lookup with no note or velocity arithmetic:
+      note_off_bytes[pad]            - Note Off triple
+      note_on_bytes[pad][color]      - Note On triple ("OFF" is absent; it is sent as a Note Off)
+      direct_pad_bytes[pad][color]   - the single message that sets a pad to a color
+      message_for_bytes[triple]      - prebuilt mido.Message, for ports without a raw-bytes API
+      note_to_pad_table[note]        - pad index a pressed note belongs to (None if none)
+    """
+
+    def __init__(self, name: str, port_keywords: list[str], channel: int, pad_grid_notes: list[list[int]],
+                 color_to_velocity: dict[str, int], direct_overwrite: bool = False):
+        if not 0 <= channel <= 15:
+            raise ValueError(f"channel must be 0-15, got {channel}")
+        if not pad_grid_notes or any(len(row) != len(pad_grid_notes[0]) for row in pad_grid_notes):
+            raise ValueError("notes must be a non-empty list of equally long rows")
+        notes = [note for row in pad_grid_notes for note in row]
+        if any(not isinstance(note, int) or not 0 <= note <= 127 for note in notes):
+            raise ValueError("notes must be integers 0-127")
+        if len(set(notes)) != len(notes):
+            raise ValueError("notes must be unique (each pad needs its own note)")
+        palette = {str(color).upper(): velocity for color, velocity in color_to_velocity.items()}
+        if "OFF" not in palette:
+            raise ValueError("palette must contain OFF")
+        if any(not isinstance(velocity, int) or not 0 <= velocity <= 127 for velocity in palette.values()):
+            raise ValueError("palette velocities must be integers 0-127")
+
+        self.name = name
+        self.port_keywords = [keyword.lower() for keyword in port_keywords]
+        self.channel = channel
+        self.grid_rows = len(pad_grid_notes)
+        self.grid_cols = len(pad_grid_notes[0])
+        self.pad_grid_notes = [list(row) for row in pad_grid_notes]
+        self.color_to_velocity = palette
+        self.direct_overwrite = direct_overwrite
+
+        # --- Compiled tables ---
+        self.pad_count = len(notes)
+        self.pad_index_to_note = notes
+        self.note_to_pad = {note: pad for pad, note in enumerate(notes)}
+        # Input side: note number -> pad index (None for notes that are no pad), indexed directly by the note
+        self.note_to_pad_table: list[int | None] = [self.note_to_pad.get(note) for note in range(128)]
+        self.velocity_to_color = {velocity: color for color, velocity in palette.items()}
+        self.note_off_bytes = [bytes((0x80 | channel, note, 0)) for note in notes]
+        self.note_on_bytes = [
+            {color: bytes((0x90 | channel, note, velocity)) for color, velocity in palette.items() if color != "OFF"}
+            for note in notes
+        ]
+        self.direct_pad_bytes = [dict(self.note_on_bytes[pad], OFF=self.note_off_bytes[pad]) for pad in range(self.pad_count)]
+        self.message_for_bytes = {
+            data: mido.Message.from_bytes(data)
+            for data in self.note_off_bytes + [b for pad_table in self.note_on_bytes for b in pad_table.values()]
+        }
+
+    def matches_port(self, port_name: str) -> bool:
+        port_name = port_name.lower()
+        return any(keyword in port_name for keyword in self.port_keywords)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DeviceProfile':
+        """Builds a profile from its JSON form. Raises ValueError (or KeyError/TypeError) if it is malformed."""
+        grid = data.get("grid", {})
+        notes = data["notes"]
+        if grid and (len(notes) != grid.get("rows") or any(len(row) != grid.get("cols") for row in notes)):
+            raise ValueError(f"notes do not match the {grid.get('rows')}x{grid.get('cols')} grid")
+        return cls(
+            name=str(data["name"]),
+            port_keywords=list(data.get("port_keywords", [])),
+            channel=int(data.get("channel", 0)),
+            pad_grid_notes=notes,
+            color_to_velocity=dict(data["palette"]),
+            direct_overwrite=bool(data.get("direct_overwrite", False)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "port_keywords": list(self.port_keywords),
+            "channel": self.channel,
+            "grid": {"rows": self.grid_rows, "cols": self.grid_cols},
+            "notes": [list(row) for row in self.pad_grid_notes],
+            "palette": dict(self.color_to_velocity),
+            "direct_overwrite": self.direct_overwrite,
+        }
+
+
+def load_device_profile(filepath: str) -> DeviceProfile | None:
+    try:
+        with open(filepath, 'r') as f:
+            return DeviceProfile.from_dict(json.load(f))
+    except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError) as e:
+        print(f"Warning: Could not load device profile {filepath}: {e}. Skipping.")
+        return None
+
+
+def load_device_profiles(profiles_dir: str = DEVICE_PROFILES_DIR) -> list[DeviceProfile]:
+    """Loads every *.json profile in profiles_dir, sorted by file name. Unreadable files are skipped."""
+    if not os.path.isdir(profiles_dir):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(profiles_dir)):
+        if filename.endswith(".json"):
+            profile = load_device_profile(os.path.join(profiles_dir, filename))
+            if profile is not None:
+                profiles.append(profile)
+    return profiles
@@ -0,0 +1,53 @@
+# MidiPlusSmartPadRGBEditor/core/frame_buffer_cache.py
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_FRAME_CACHE_SIZE = 256 # Compiled frames kept; a looping animation rarely has more distinct transitions
+
+
+class FrameBufferCache:
+    """
+    Bounded LRU cache for compiled frames, keyed by frame content (e.g. a tuple of color
+    names). Since the key is the content itself, editing a frame simply produces a new
+    key; stale entries are never hit again and age out. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_FRAME_CACHE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached value for key (marking it most recently used), or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
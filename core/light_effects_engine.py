@@ -0,0 +1,371 @@
+# MidiPlusSmartPadRGBEditor/core/light_effects_engine.py
+
+import math
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import Qt
+
+EFFECT_RIPPLE = 0 # A ring expanding from the pressed pad
+EFFECT_TRAIL = 1 # A fading line from the previous press to this one (just the pad if presses are far apart)
+EFFECT_GLOW = 2 # The pressed pad (and a halo) brightens while held and fades after release
+EFFECT_NAMES = {EFFECT_RIPPLE: "ripple", EFFECT_TRAIL: "trail", EFFECT_GLOW: "glow"}
+
+MAX_ACTIVE_EFFECTS = 64 # Effect pool size; when full, a new effect takes over the oldest slot
+EFFECTS_MIN_TICK_MS = 10 # Tick period floor, even if the device could take frames faster
+EFFECTS_STOP_TIMEOUT_S = 1.0
+EFFECT_MIN_INTENSITY = 0.05 # Below this a pad shows the base frame instead
+
+RIPPLE_SPEED_PADS_PER_S = 12.0
+RIPPLE_WIDTH_PADS = 1.0
+TRAIL_DURATION_S = 0.6
+TRAIL_STEP_S = 0.06 # Each pad back along a trail fades this much earlier than the one ahead of it
+TRAIL_LINK_S = 0.5 # Presses further apart than this start a new trail instead of extending the last one
+GLOW_ATTACK_S = 0.15
+GLOW_RELEASE_S = 0.4
+GLOW_HALO_LEVEL = 0.5 # Halo intensity relative to the held pad
+
+# The device shows palette colors, not brightness levels: each effect kind fades through a
+# short ramp of colors, brightest first, and the intensity picks the entry
+DEFAULT_EFFECT_RAMPS = {
+    EFFECT_RIPPLE: ("WHITE", "LIGHTBLUE", "DARKBLUE"),
+    EFFECT_TRAIL: ("YELLOW", "RED", "PURPLE"),
+    EFFECT_GLOW: ("WHITE", "YELLOW", "RED"),
+}
+
+
+class LightEffectsEngine:
+    """
+    Reactive lighting driven by pad presses: ripples, trails and press-and-hold glows.
+
+    A tick thread renders at a fixed rate (by default the controller's minimum frame delay)
+    and pushes only the pads whose color changed, through SmartPadController.set_pads().
+    Active effects live in a fixed pool stored as parallel arrays (kind, origin, trail start, start time,
+    peak, held, release time), and every pad's distance to every other pad is tabulated once
+    per grid, so a tick allocates no per-effect objects and a ripple only visits the pads on
+    its ring. Effects are composited into one pad buffer: the brightest effect on a pad wins.
+    Presses arrive on the MIDI input thread; they are queued with their timestamp and wake the
+    tick thread. While no effect is active the thread sleeps until a press, which then lights
+    up at once; ticks never run closer together than the tick period, so presses cannot push
+    frames faster than the device takes them.
+    """
+
+    def __init__(self, controller, effect_ramps: dict[int, tuple[str, ...]] | None = None):
+        self.controller = controller
+        self.effect_ramps = dict(DEFAULT_EFFECT_RAMPS if effect_ramps is None else effect_ramps)
+        self.press_effects: tuple[int, ...] = (EFFECT_RIPPLE, EFFECT_TRAIL, EFFECT_GLOW) # Triggered by every press
+        self._events: deque = deque() # (perf_counter time, pad, velocity, kind); velocity 0 = release, kind None = press_effects
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stats_lock = threading.Lock()
+        self._base_frame: list[str] = []
+        self._configure_grid(controller.profile.grid_rows, controller.profile.grid_cols)
+        self._reset_stats()
+
+        # --- Effect pool, struct-of-arrays ---
+        self._active = [False] * MAX_ACTIVE_EFFECTS
+        self._kind = [0] * MAX_ACTIVE_EFFECTS
+        self._origin = [0] * MAX_ACTIVE_EFFECTS
+        self._start = [0.0] * MAX_ACTIVE_EFFECTS
+        self._peak = [0.0] * MAX_ACTIVE_EFFECTS
+        self._held = [False] * MAX_ACTIVE_EFFECTS
+        self._release_time = [0.0] * MAX_ACTIVE_EFFECTS
+        self._release_level = [0.0] * MAX_ACTIVE_EFFECTS
+        self._trail_from = [0] * MAX_ACTIVE_EFFECTS # Pad a trail starts at; its origin is the pad it ends at
+        self._last_press_pad = -1
+        self._last_press_time = 0.0
+
+    def _configure_grid(self, rows: int, cols: int) -> None:
+        pad_count = rows * cols
+        self._rows, self._cols, self._pad_count = rows, cols, pad_count
+        # distance[origin][pad] and rings[origin][d] = pads whose distance rounds to d
+        self._distance = [[math.hypot(o // cols - p // cols, o % cols - p % cols) for p in range(pad_count)]
+                          for o in range(pad_count)]
+        self._rings = []
+        for origin in range(pad_count):
+            rings = [[] for _ in range(int(max(self._distance[origin])) + 2)]
+            for pad, d in enumerate(self._distance[origin]):
+                rings[int(round(d))].append(pad)
+            self._rings.append(rings)
+        self._reach = [max(row) for row in self._distance] # Farthest pad from each origin
+        self._max_distance = max(self._reach)
+        # segments[start][end] = pads on the straight line from start to end, both included
+        self._segments = [[self._line(start, end, cols) for end in range(pad_count)] for start in range(pad_count)]
+        self._glow_slot_for_pad = [-1] * pad_count
+        # Composite buffers, reused every tick
+        self._intensity = [0.0] * pad_count
+        self._winner_kind = [-1] * pad_count
+        self._zero_intensity = [0.0] * pad_count
+        self._no_kind = [-1] * pad_count
+        self._shown = ["OFF"] * pad_count # What the engine last pushed to each pad
+        if len(self._base_frame) != pad_count:
+            self._base_frame = ["OFF"] * pad_count
+
+    # --- Control ---
+    def start(self, base_frame: list[str] | None = None, tick_ms: int | None = None) -> bool:
+        """
+        Starts rendering over base_frame (what the pads show where no effect is active) and
+        listening to the controller's pad presses. tick_ms defaults to the fastest frame rate
+        the controller's output budget allows. Returns False if the controller is not connected.
+        """
+        self.stop(restore=False)
+        if not self.controller.is_connected():
+            return False
+        profile = self.controller.profile
+        if (profile.grid_rows, profile.grid_cols) != (self._rows, self._cols):
+            self._configure_grid(profile.grid_rows, profile.grid_cols)
+        if base_frame is not None:
+            self.set_base_frame(base_frame)
+        if tick_ms is None:
+            tick_ms = self.controller.min_frame_delay_ms()
+        period_s = max(EFFECTS_MIN_TICK_MS, int(tick_ms)) / 1000.0
+        for slot in range(MAX_ACTIVE_EFFECTS):
+            self._active[slot] = False
+        self._glow_slot_for_pad = [-1] * self._pad_count
+        self._last_press_pad = -1
+        self._shown = list(self._base_frame)
+        self._events.clear()
+        self._reset_stats()
+        self._stop_event.clear()
+        self._wake_event.clear()
+        # Direct connections: presses are queued straight from the MIDI input thread, no GUI-thread hop
+        self.controller.pad_pressed.connect(self.on_pad_pressed, Qt.ConnectionType.DirectConnection)
+        self.controller.pad_released.connect(self.on_pad_released, Qt.ConnectionType.DirectConnection)
+        self._thread = threading.Thread(target=self._run, args=(period_s,), name="SmartPadEffects", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, restore: bool = True, timeout: float | None = EFFECTS_STOP_TIMEOUT_S) -> None:
+        """Stops the tick thread. With restore, pads still lit by an effect are set back to the base frame."""
+        if self._thread is None:
+            return
+        try:
+            self.controller.pad_pressed.disconnect(self.on_pad_pressed)
+            self.controller.pad_released.disconnect(self.on_pad_released)
+        except TypeError:
+            pass # Already disconnected
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        if restore and self.controller.is_connected():
+            base = self._base_frame
+            changed = {pad: base[pad] for pad in range(self._pad_count) if self._shown[pad] != base[pad]}
+            if changed:
+                self.controller.set_pads(changed, silent=True)
+        self._shown = list(self._base_frame)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_base_frame(self, color_names_list: list[str]) -> None:
+        """What the pads show under the effects; takes effect at the next tick."""
+        if len(color_names_list) == self._pad_count:
+            self._base_frame = [str(name).upper() for name in color_names_list]
+            self._wake_event.set()
+
+    # --- Input (called from the MIDI input thread) ---
+    def on_pad_pressed(self, pad_index: int, velocity: int = 127) -> None:
+        self._events.append((time.perf_counter(), pad_index, max(1, velocity), None))
+        self._wake_event.set()
+
+    def on_pad_released(self, pad_index: int) -> None:
+        self._events.append((time.perf_counter(), pad_index, 0, None)) # No early tick needed; the glow just starts fading
+
+    def trigger(self, kind: int, pad_index: int, velocity: int = 127) -> None:
+        """Starts one effect at a pad (e.g. from code rather than a press). Thread-safe; rendered at the next tick."""
+        self._events.append((time.perf_counter(), pad_index, max(1, velocity), kind))
+        self._wake_event.set()
+
+    def get_stats(self) -> dict:
+        """Ticks rendered, mean/max render time (ms), pads pushed and peak number of simultaneous effects."""
+        with self._stats_lock:
+            ticks = self._ticks
+            return {
+                "ticks": ticks,
+                "mean_tick_ms": self._tick_total_ms / ticks if ticks else 0.0,
+                "max_tick_ms": self._max_tick_ms,
+                "pads_pushed": self._pads_pushed,
+                "max_active_effects": self._max_active,
+            }
+
+    def _reset_stats(self) -> None:
+        with self._stats_lock:
+            self._ticks = 0
+            self._tick_total_ms = 0.0
+            self._max_tick_ms = 0.0
+            self._pads_pushed = 0
+            self._max_active = 0
+
+    @staticmethod
+    def _line(start: int, end: int, cols: int) -> list[int]:
+        """Pads from start to end along the grid line (Bresenham), both ends included."""
+        row, col = divmod(start, cols)
+        end_row, end_col = divmod(end, cols)
+        d_row, d_col = abs(end_row - row), abs(end_col - col)
+        step_row, step_col = (1 if end_row > row else -1), (1 if end_col > col else -1)
+        error = d_col - d_row
+        pads = [start]
+        while (row, col) != (end_row, end_col):
+            doubled = 2 * error
+            if doubled > -d_row:
+                error -= d_row
+                col += step_col
+            if doubled < d_col:
+                error += d_col
+                row += step_row
+            pads.append(row * cols + col)
+        return pads
+
+    # --- Tick thread ---
+    def _run(self, period_s: float) -> None:
+        while not self._stop_event.is_set():
+            began = time.perf_counter()
+            changed, active_count = self.render(began)
+            if changed:
+                self.controller.set_pads(changed, silent=True)
+            elapsed_ms = (time.perf_counter() - began) * 1000.0
+            with self._stats_lock:
+                self._ticks += 1
+                self._tick_total_ms += elapsed_ms
+                self._max_tick_ms = max(self._max_tick_ms, elapsed_ms)
+                self._pads_pushed += len(changed)
+                self._max_active = max(self._max_active, active_count)
+
+            self._wake_event.clear()
+            if not active_count and not self._events:
+                self._wake_event.wait() # Nothing to animate: sleep until a press, a new base frame or stop()
+            # Never tick sooner than one period after the last tick, even when woken by a press
+            wait_s = began + period_s - time.perf_counter()
+            if wait_s > 0:
+                self._stop_event.wait(wait_s)
+
+    def render(self, now: float) -> tuple[dict[int, str], int]:
+        """
+        Applies queued presses, composites every active effect at time now and returns
+        ({pad: color} for pads that changed since the last render, active effect count).
+        Called by the tick thread; usable directly from scripts and benchmarks when not running.
+        """
+        self._apply_events()
+        intensity, winner = self._intensity, self._winner_kind
+        intensity[:] = self._zero_intensity
+        winner[:] = self._no_kind
+        active, kinds, origins, starts, peaks = self._active, self._kind, self._origin, self._start, self._peak
+        distance, rings, segments, reach = self._distance, self._rings, self._segments, self._reach
+        active_count = 0
+
+        for slot in range(MAX_ACTIVE_EFFECTS):
+            if not active[slot]:
+                continue
+            kind, origin, age, peak = kinds[slot], origins[slot], now - starts[slot], peaks[slot]
+            if kind == EFFECT_RIPPLE:
+                radius = age * RIPPLE_SPEED_PADS_PER_S
+                level = peak * (1.0 - radius / (self._max_distance + RIPPLE_WIDTH_PADS))
+                if radius - RIPPLE_WIDTH_PADS > reach[origin] or level < EFFECT_MIN_INTENSITY:
+                    active[slot] = False
+                    continue
+                origin_distance, origin_rings = distance[origin], rings[origin]
+                first = max(0, int(radius - RIPPLE_WIDTH_PADS))
+                last = min(len(origin_rings) - 1, int(radius + RIPPLE_WIDTH_PADS) + 1)
+                for ring in range(first, last + 1):
+                    for pad in origin_rings[ring]:
+                        value = level * (1.0 - abs(origin_distance[pad] - radius) / RIPPLE_WIDTH_PADS)
+                        if value > intensity[pad]:
+                            intensity[pad] = value
+                            winner[pad] = kind
+            elif kind == EFFECT_TRAIL:
+                if peak * (1.0 - age / TRAIL_DURATION_S) < EFFECT_MIN_INTENSITY: # Head invisible, so is the rest
+                    active[slot] = False
+                    continue
+                # Walk back from the head (the pressed pad); older parts of the line fade first
+                path = segments[self._trail_from[slot]][origin]
+                for step in range(len(path)):
+                    value = peak * (1.0 - (age + step * TRAIL_STEP_S) / TRAIL_DURATION_S)
+                    if value < EFFECT_MIN_INTENSITY:
+                        break
+                    pad = path[-1 - step]
+                    if value > intensity[pad]:
+                        intensity[pad] = value
+                        winner[pad] = kind
+            else: # EFFECT_GLOW
+                if self._held[slot]:
+                    value = peak * min(1.0, age / GLOW_ATTACK_S)
+                else:
+                    value = self._release_level[slot] * (1.0 - (now - self._release_time[slot]) / GLOW_RELEASE_S)
+                    if value < EFFECT_MIN_INTENSITY:
+                        active[slot] = False
+                        continue
+                if value > intensity[origin]:
+                    intensity[origin] = value
+                    winner[origin] = kind
+                halo = value * GLOW_HALO_LEVEL
+                for pad in rings[origin][1]:
+                    if halo > intensity[pad]:
+                        intensity[pad] = halo
+                        winner[pad] = kind
+            active_count += 1
+
+        # Map intensities to colors and collect the pads that changed
+        ramps, base, shown = self.effect_ramps, self._base_frame, self._shown
+        changed = {}
+        for pad in range(self._pad_count):
+            value = intensity[pad]
+            if value < EFFECT_MIN_INTENSITY:
+                color = base[pad]
+            else:
+                ramp = ramps[winner[pad]]
+                color = ramp[min(len(ramp) - 1, int((1.0 - min(value, 1.0)) * len(ramp)))]
+            if color != shown[pad]:
+                shown[pad] = color
+                changed[pad] = color
+        return changed, active_count
+
+    def _apply_events(self) -> None:
+        events = self._events
+        while events:
+            event_time, pad, velocity, kind = events.popleft()
+            if not 0 <= pad < self._pad_count:
+                continue
+            if velocity > 0:
+                # A trail runs from the previous press if it was recent enough
+                linked = self._last_press_pad >= 0 and event_time - self._last_press_time <= TRAIL_LINK_S
+                trail_from = self._last_press_pad if linked else pad
+                for effect_kind in (self.press_effects if kind is None else (kind,)):
+                    self._add_effect(effect_kind, pad, event_time, velocity / 127.0, trail_from)
+                self._last_press_pad, self._last_press_time = pad, event_time
+            else:
+                self._release_glow(pad, event_time)
+
+    def _add_effect(self, kind: int, pad: int, start: float, peak: float, trail_from: int) -> None:
+        if kind not in self.effect_ramps:
+            return
+        if kind == EFFECT_GLOW:
+            self._release_glow(pad, start) # A re-press replaces the pad's glow
+        active, starts = self._active, self._start
+        slot = next((s for s in range(MAX_ACTIVE_EFFECTS) if not active[s]), -1)
+        if slot < 0:
+            slot = min(range(MAX_ACTIVE_EFFECTS), key=starts.__getitem__) # Pool full: reuse the oldest
+            if self._kind[slot] == EFFECT_GLOW and self._glow_slot_for_pad[self._origin[slot]] == slot:
+                self._glow_slot_for_pad[self._origin[slot]] = -1
+        active[slot] = True
+        self._kind[slot] = kind
+        self._origin[slot] = pad
+        starts[slot] = start
+        self._peak[slot] = peak
+        self._trail_from[slot] = trail_from
+        self._held[slot] = kind == EFFECT_GLOW
+        if kind == EFFECT_GLOW:
+            self._glow_slot_for_pad[pad] = slot
+
+    def _release_glow(self, pad: int, release_time: float) -> None:
+        slot = self._glow_slot_for_pad[pad]
+        if slot < 0:
+            return
+        self._glow_slot_for_pad[pad] = -1
+        if self._active[slot] and self._held[slot]:
+            self._held[slot] = False
+            self._release_time[slot] = release_time
+            self._release_level[slot] = self._peak[slot] * min(1.0, (release_time - self._start[slot]) / GLOW_ATTACK_S)
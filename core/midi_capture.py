@@ -0,0 +1,190 @@
+# MidiPlusSmartPadRGBEditor/core/midi_capture.py
+
+import struct
+import sys
+import threading
+import time
+from typing import Callable
+
+import mido
+
+from core.precise_timing import wait_until
+
+# Captures use 1 tick = 1 microsecond: 1000 ticks per beat at 1000 microseconds per beat
+CAPTURE_TICKS_PER_BEAT = 1000
+CAPTURE_TEMPO_US_PER_BEAT = 1000
+CAPTURE_WRITE_BUFFER_BYTES = 256 * 1024
+MAX_VARLEN_DELTA = 0x0FFFFFFF # Largest SMF delta time (~268 s at 1 tick/us)
+BURST_WINDOW_S = 0.010 # Window used by capture_statistics() to find the peak message rate
+REPLAY_MAX_SPEED_CHUNK = 256 # Messages handed over per call when replaying at maximum speed
+
+
+def _encode_varlen(value: int) -> bytes:
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
+
+
+class MidiCaptureRecorder:
+    """
+    Streams outgoing MIDI messages with high-resolution timestamps into a Standard MIDI File
+    (format 0, one track, 1 tick = 1 us). Events go through a large buffered writer, so
+    recording costs a perf_counter() call and a small append per message; the track
+    length in the header is patched in when the capture is closed.
+    Thread-safe: record() is called from the output worker, stop from the GUI.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._file = open(filepath, "wb", buffering=CAPTURE_WRITE_BUFFER_BYTES)
+        self._file.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, CAPTURE_TICKS_PER_BEAT))
+        self._track_length_offset = self._file.tell() + 4
+        self._file.write(b"MTrk" + struct.pack(">I", 0)) # Length patched in close()
+        self._track_bytes = 0
+        self._write_event(0, b"\xFF\x51\x03" + CAPTURE_TEMPO_US_PER_BEAT.to_bytes(3, "big"))
+        self._start_time: float | None = None
+        self._last_tick = 0
+        self.message_count = 0
+
+    def record(self, timestamp: float, data: bytes) -> None:
+        """Appends one message sent at perf_counter() time `timestamp`."""
+        with self._lock:
+            if self._file is None:
+                return
+            if self._start_time is None:
+                self._start_time = timestamp
+            tick = max(self._last_tick, int(round((timestamp - self._start_time) * 1_000_000)))
+            delta = tick - self._last_tick
+            while delta > MAX_VARLEN_DELTA: # Bridge long idle gaps with empty marker events
+                self._write_event(MAX_VARLEN_DELTA, b"\xFF\x06\x00")
+                delta -= MAX_VARLEN_DELTA
+            self._write_event(delta, data)
+            self._last_tick = tick
+            self.message_count += 1
+
+    def _write_event(self, delta: int, payload: bytes) -> None:
+        chunk = _encode_varlen(delta) + payload
+        self._file.write(chunk)
+        self._track_bytes += len(chunk)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._write_event(0, b"\xFF\x2F\x00") # End of track
+                self._file.seek(self._track_length_offset)
+                self._file.write(struct.pack(">I", self._track_bytes))
+            finally:
+                self._file.close()
+                self._file = None
+
+
+def read_capture(filepath: str) -> list[tuple[float, bytes]]:
+    """Returns (seconds since first message, raw bytes) for every channel message in a capture."""
+    events = []
+    elapsed = 0.0
+    for msg in mido.MidiFile(filepath): # Iterating a MidiFile yields times in seconds
+        elapsed += msg.time
+        if not msg.is_meta:
+            events.append((elapsed, bytes(msg.bytes())))
+    return events
+
+
+def capture_statistics(filepath: str) -> dict:
+    """Burst profile of a capture: totals, mean and peak message rate, and the longest gap."""
+    events = read_capture(filepath)
+    if not events:
+        return {"message_count": 0, "duration_s": 0.0, "mean_rate": 0.0, "peak_rate": 0.0, "longest_gap_s": 0.0}
+    times = [t for t, _ in events]
+    duration = times[-1] - times[0]
+    peak_in_window = 0
+    window_start = 0
+    for i, t in enumerate(times):
+        while t - times[window_start] > BURST_WINDOW_S:
+            window_start += 1
+        peak_in_window = max(peak_in_window, i - window_start + 1)
+    return {
+        "message_count": len(events),
+        "duration_s": duration,
+        "mean_rate": len(events) / duration if duration > 0 else 0.0,
+        "peak_rate": peak_in_window / BURST_WINDOW_S,
+        "longest_gap_s": max((b - a for a, b in zip(times, times[1:])), default=0.0),
+    }
+
+
+class MidiCaptureReplayer(threading.Thread):
+    """
+    Re-sends a capture through send_messages (e.g. SmartPadController.send_raw_messages),
+    either with the original timing (coarse sleep, then a short spin to each deadline)
+    or as fast as the receiver accepts it. on_finished(sent_count, late_ms_max) is
+    called when done or cancelled.
+    """
+
+    def __init__(self, filepath: str, send_messages: Callable[[list[bytes]], None],
+                 max_speed: bool = False,
+                 wait_for_output: Callable[[float], bool] | None = None,
+                 on_finished: Callable[[int, float], None] | None = None):
+        super().__init__(name="SmartPadCaptureReplay", daemon=True)
+        self._filepath = filepath
+        self._send_messages = send_messages
+        self._max_speed = max_speed
+        self._wait_for_output = wait_for_output
+        self._on_finished = on_finished
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:
+        sent = 0
+        late_max_s = 0.0
+        try:
+            events = read_capture(self._filepath)
+            if self._max_speed:
+                for start in range(0, len(events), REPLAY_MAX_SPEED_CHUNK):
+                    if self._cancel_event.is_set():
+                        break
+                    chunk = [data for _, data in events[start:start + REPLAY_MAX_SPEED_CHUNK]]
+                    self._send_messages(chunk)
+                    sent += len(chunk)
+                    if self._wait_for_output: # Don't outrun a bounded output queue
+                        self._wait_for_output(5.0)
+                return
+
+            origin = time.perf_counter()
+            i = 0
+            while i < len(events) and not self._cancel_event.is_set():
+                offset = events[i][0]
+                group = []
+                while i < len(events) and events[i][0] == offset: # Same timestamp: one hand-over
+                    group.append(events[i][1])
+                    i += 1
+                deadline = origin + offset
+                if not wait_until(deadline, self._cancel_event):
+                    break
+                late_max_s = max(late_max_s, time.perf_counter() - deadline)
+                self._send_messages(group)
+                sent += len(group)
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Error replaying MIDI capture '{self._filepath}': {e}")
+        finally:
+            if self._on_finished:
+                self._on_finished(sent, late_max_s * 1000.0)
+
+
+if __name__ == '__main__':
+    # Quick burst profile of a capture file: python -m core.midi_capture capture.mid
+    if len(sys.argv) < 2:
+        print("Usage: python -m core.midi_capture <capture.mid>")
+        sys.exit(1)
+    stats = capture_statistics(sys.argv[1])
+    print(f"Messages:     {stats['message_count']}")
+    print(f"Duration:     {stats['duration_s']:.3f} s")
+    print(f"Mean rate:    {stats['mean_rate']:,.0f} msgs/s")
+    print(f"Peak rate:    {stats['peak_rate']:,.0f} msgs/s (over {BURST_WINDOW_S * 1000:.0f} ms windows)")
+    print(f"Longest gap:  {stats['longest_gap_s'] * 1000:.1f} ms")
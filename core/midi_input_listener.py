@@ -0,0 +1,79 @@
+# MidiPlusSmartPadRGBEditor/core/midi_input_listener.py
+
+import re
+from typing import Callable
+
+import mido
+
+from core.smartpad_emulator import is_emulated_port_name, open_emulated_input
+
+_PORT_INDEX_SUFFIX = re.compile(r"\s+\d+$") # Windows backends append " 1", " 2"... and may number ins and outs differently
+
+
+def match_input_port_name(output_port_name: str, input_names: list[str], keywords: list[str] = ()) -> str | None:
+    """
+    Finds the input port that belongs to an output port: the same name, the same name up to
+    the trailing port index, the same name with "Out" read as "In", or, as a last resort, the
+    only input whose name contains one of the device keywords.
+    """
+    if output_port_name in input_names:
+        return output_port_name
+    base = _PORT_INDEX_SUFFIX.sub("", output_port_name).lower()
+    for name in input_names:
+        if _PORT_INDEX_SUFFIX.sub("", name).lower() == base:
+            return name
+    as_input = re.sub(r"\bout(put)?\b", lambda m: "in" if m.group(1) is None else "input", base)
+    for name in input_names:
+        if _PORT_INDEX_SUFFIX.sub("", name).lower() == as_input:
+            return name
+    candidates = [name for name in input_names if any(keyword in name.lower() for keyword in keywords)]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+class MidiInputListener:
+    """
+    Listens on a device's MIDI input port. The port is opened with a callback, so messages
+    are handed to on_message on the MIDI backend's own thread as they arrive: no polling
+    loop and no GUI-thread hop before the owner sees a press.
+    """
+
+    def __init__(self, on_message: Callable[[mido.Message], None]):
+        self._on_message = on_message
+        self._port = None
+        self.port_name: str | None = None
+
+    def open_for_output(self, output_port_name: str, keywords: list[str] = ()) -> bool:
+        """Opens the input matching output_port_name (see match_input_port_name). Returns False if there is none."""
+        self.close()
+        if is_emulated_port_name(output_port_name):
+            self._port = open_emulated_input(output_port_name, self._on_message)
+            self.port_name = output_port_name
+            return True
+        try:
+            input_names = mido.get_input_names()
+        except Exception as e:
+            print(f"DEBUG SC: Error in mido.get_input_names(): {e}")
+            input_names = []
+        input_name = match_input_port_name(output_port_name, input_names, keywords)
+        if input_name is None:
+            return False
+        try:
+            self._port = mido.open_input(input_name, callback=self._on_message)
+            self.port_name = input_name
+            return True
+        except Exception as e:
+            print(f"Warning: Could not open MIDI input {input_name}: {e}")
+            self._port = None
+            return False
+
+    def is_open(self) -> bool:
+        return self._port is not None and not self._port.closed
+
+    def close(self) -> None:
+        if self._port is not None:
+            try:
+                self._port.close()
+            except Exception as e:
+                print(f"Error closing MIDI input {self.port_name}: {e}")
+        self._port = None
+        self.port_name = None
@@ -0,0 +1,287 @@
+# MidiPlusSmartPadRGBEditor/core/midi_output_worker.py
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+DEFAULT_OUTPUT_QUEUE_SIZE = 64  # Jobs (frames, pad edits, clears) waiting for the MIDI port
+# Waits shorter than this use time.sleep() instead of a condition wait: condition timeouts
+# can be as coarse as ~15 ms on Windows, far too long for a 1-2 ms inter-command gap.
+PACER_SHORT_WAIT_S = 0.002
+
+
+class MidiOutputPacer:
+    """
+    Holds follow-up messages that must not go out before a deadline, e.g. the Note On
+    that follows a pad's Note Off after inter_command_delay. Entries are keyed by pad:
+    scheduling or cancelling a pad supersedes any follow-up still pending for it, so a
+    newer write can never be overtaken by an older delayed one.
+    Not thread-safe on its own; MidiOutputWorker guards it with its condition lock.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, int]] = [] # (deadline, sequence, key)
+        self._pending: dict[int, tuple[int, bytes]] = {} # key -> (sequence, message)
+        self._sequence = itertools.count()
+
+    def schedule(self, deadline: float, key: int, message: bytes) -> None:
+        sequence = next(self._sequence)
+        self._pending[key] = (sequence, message)
+        heapq.heappush(self._heap, (deadline, sequence, key))
+
+    def cancel(self, keys) -> None:
+        for key in keys:
+            self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._pending.clear()
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def has_due(self, now: float) -> bool:
+        """True if the earliest entry's deadline has passed (it may be a superseded one; pop_due() skips those)."""
+        try:
+            return self._heap[0][0] <= now
+        except IndexError:
+            return False
+
+    def pop_due(self, now: float) -> list[tuple[int, bytes]]:
+        """Returns the (key, message) pairs whose deadline has passed, in deadline order."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            entry = self._pending.get(key)
+            if entry is not None and entry[0] == sequence: # Skip superseded/cancelled entries
+                del self._pending[key]
+                due.append((key, entry[1]))
+        return due
+
+    def time_until_next(self, now: float) -> float | None:
+        heap = self._heap
+        while heap: # Drop stale heads so they don't cause needless wake-ups
+            _, sequence, key = heap[0]
+            entry = self._pending.get(key)
+            if entry is not None and entry[0] == sequence:
+                return max(0.0, heap[0][0] - now)
+            heapq.heappop(heap)
+        return None
+
+
+class MidiOutputWorker(threading.Thread):
+    """
+    Background thread that owns all writes to the MIDI output port.
+    Callers hand it jobs (plain callables) through a bounded queue and return immediately,
+    so the GUI thread never waits on the port or on inter-command delays.
+    If the queue is full, the oldest job is dropped to make room for the newest one.
+    Jobs never sleep for pacing either: they call send_after() and the worker keeps
+    running other jobs until the follow-up's deadline comes up.
+
+    There are two lanes. Priority jobs (interactive edits, clears) run before any queued
+    bulk job, and bulk traffic sent through send_preemptible() checks for them, and for
+    paced follow-ups that have come due, between messages: both a click's Note Off and its
+    Note On reach the port within one message slot of being due, even mid-frame.
+    send_messages(messages, should_yield) must stop early once should_yield() returns
+    True and return how many messages it consumed.
+    """
+
+    def __init__(self,
+                 send_messages: Callable[[list[bytes], Callable[[], bool] | None], int],
+                 on_queue_depth_changed: Callable[[int], None] | None = None,
+                 on_error: Callable[[str], None] | None = None,
+                 on_job_dropped: Callable[[Callable[[], None]], None] | None = None,
+                 max_queue_size: int = DEFAULT_OUTPUT_QUEUE_SIZE,
+                 name: str = "SmartPadMidiOutput"):
+        super().__init__(name=name, daemon=True)
+        self._send_messages = send_messages
+        self._jobs: deque[Callable[[], None]] = deque() # Bulk lane
+        self._priority_jobs: deque[Callable[[], None]] = deque()
+        self._cancelled_while_preempting: set | None = None # Keys cancelled by jobs run from run_priority_jobs()
+        self._max_queue_size = max(1, max_queue_size)
+        self._pacer = MidiOutputPacer()
+        self._condition = threading.Condition()
+        self._job_running = False
+        self._stop_requested = False
+        self._on_queue_depth_changed = on_queue_depth_changed
+        self._on_error = on_error
+        self._on_job_dropped = on_job_dropped
+        self.dropped_job_count = 0
+
+    def submit(self, job: Callable[[], None], priority: bool = False) -> bool:
+        """
+        Queues a job without blocking, in the priority or the bulk lane.
+        Returns False if an older job in that lane had to be dropped.
+        """
+        with self._condition:
+            if self._stop_requested:
+                return False
+            lane = self._priority_jobs if priority else self._jobs
+            dropped = None
+            if len(lane) >= self._max_queue_size:
+                dropped = lane.popleft()
+                self.dropped_job_count += 1
+            lane.append(job)
+            depth = len(self._jobs) + len(self._priority_jobs)
+            self._condition.notify_all()
+        if dropped is not None and self._on_job_dropped:
+            self._on_job_dropped(dropped)
+        self._report_queue_depth(depth)
+        return dropped is None
+
+    def send_after(self, delay_s: float, keyed_messages: list[tuple[int, bytes]]) -> None:
+        """
+        Schedules (key, message) pairs to be sent delay_s from now, replacing any follow-up
+        still pending for the same keys. Meant to be called from inside a running job.
+        """
+        deadline = time.perf_counter() + delay_s
+        with self._condition:
+            for key, message in keyed_messages:
+                self._pacer.schedule(deadline, key, message)
+            self._condition.notify_all()
+
+    def cancel_follow_ups(self, keys) -> None:
+        """Drops pending follow-ups for the given keys (e.g. pads that are about to be rewritten)."""
+        with self._condition:
+            self._pacer.cancel(keys)
+        if self._cancelled_while_preempting is not None: # Only ever set on the worker thread
+            self._cancelled_while_preempting.update(keys)
+
+    def has_priority_jobs(self) -> bool:
+        return bool(self._priority_jobs) # Lock-free peek; polled between bulk messages
+
+    def _should_preempt(self) -> bool:
+        # Polled between bulk messages: queued priority jobs, or a paced follow-up whose gap has elapsed
+        return bool(self._priority_jobs) or self._pacer.has_due(time.perf_counter())
+
+    def send_preemptible(self, keyed_messages: list[tuple[int, bytes]]) -> set:
+        """
+        Sends (key, message) pairs in order, running queued priority jobs and sending due
+        follow-ups between messages. Remaining messages for keys those jobs rewrote (cancelled)
+        are skipped. Returns the skipped keys. Call only from the worker thread (i.e. from
+        inside a bulk job).
+        """
+        overridden = set()
+        remaining = keyed_messages
+        while remaining:
+            sent = self._send_messages([message for _, message in remaining], self._should_preempt)
+            remaining = remaining[sent:]
+            if remaining:
+                overridden |= self.run_priority_jobs()
+                self._send_due_follow_ups()
+                remaining = [(key, message) for key, message in remaining if key not in overridden]
+        return overridden
+
+    def _send_due_follow_ups(self) -> None:
+        with self._condition:
+            due_messages = self._pacer.pop_due(time.perf_counter())
+        if due_messages:
+            self._send_messages([message for _, message in due_messages], None)
+
+    def run_priority_jobs(self) -> set:
+        """Runs queued priority jobs inline on the worker thread. Returns the keys they cancelled."""
+        cancelled = set()
+        self._cancelled_while_preempting = cancelled
+        try:
+            while True:
+                with self._condition:
+                    if self._stop_requested or not self._priority_jobs:
+                        break
+                    job = self._priority_jobs.popleft()
+                    depth = len(self._jobs) + len(self._priority_jobs)
+                self._report_queue_depth(depth)
+                self._run_job(job)
+        finally:
+            self._cancelled_while_preempting = None
+        return cancelled
+
+    def queue_depth(self) -> int:
+        with self._condition:
+            return len(self._jobs) + len(self._priority_jobs)
+
+    def clear_pending(self) -> int:
+        """Discards all jobs that have not started yet. Returns how many were discarded."""
+        with self._condition:
+            discarded = len(self._jobs) + len(self._priority_jobs)
+            self._jobs.clear()
+            self._priority_jobs.clear()
+            self._condition.notify_all()
+        if discarded:
+            self._report_queue_depth(0)
+        return discarded
+
+    def wait_until_idle(self, timeout: float | None = None) -> bool:
+        """Blocks until every queued job and paced follow-up has been sent. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(self._is_idle_locked, timeout)
+
+    def _is_idle_locked(self) -> bool:
+        return not self._jobs and not self._priority_jobs and not self._job_running and not self._pacer.has_pending()
+
+    def stop(self, timeout: float | None = 1.0) -> None:
+        """Stops the thread after the job currently being sent; pending jobs are discarded."""
+        with self._condition:
+            self._stop_requested = True
+            self._jobs.clear()
+            self._priority_jobs.clear()
+            self._pacer.clear()
+            self._condition.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def run(self) -> None:
+        while True:
+            due_messages = None
+            job = None
+            with self._condition:
+                while True:
+                    if self._stop_requested:
+                        return
+                    now = time.perf_counter()
+                    due_messages = self._pacer.pop_due(now)
+                    if due_messages:
+                        self._job_running = True
+                        break
+                    if self._priority_jobs or self._jobs:
+                        job = (self._priority_jobs or self._jobs).popleft()
+                        self._job_running = True
+                        break
+                    wait_s = self._pacer.time_until_next(now)
+                    if wait_s is not None and wait_s <= PACER_SHORT_WAIT_S:
+                        # Precise short wait; new jobs arriving meanwhile are picked up right after
+                        self._condition.release()
+                        try:
+                            time.sleep(wait_s)
+                        finally:
+                            self._condition.acquire()
+                    else:
+                        self._condition.wait(wait_s)
+                depth = len(self._jobs) + len(self._priority_jobs)
+            if job is not None:
+                self._report_queue_depth(depth)
+
+            try:
+                if due_messages:
+                    self._run_job(lambda: self.send_preemptible(due_messages))
+                else:
+                    self._run_job(job)
+            finally:
+                with self._condition:
+                    self._job_running = False
+                    self._condition.notify_all()
+
+    def _run_job(self, job: Callable[[], None]) -> None:
+        try:
+            job()
+        except Exception as e:
+            print(f"Error in MIDI output worker: {e}")
+            if self._on_error:
+                self._on_error(f"MIDI output error: {e}")
+
+    def _report_queue_depth(self, depth: int) -> None:
+        if self._on_queue_depth_changed:
+            self._on_queue_depth_changed(depth)
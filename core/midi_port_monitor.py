@@ -0,0 +1,87 @@
+# MidiPlusSmartPadRGBEditor/core/midi_port_monitor.py
+
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.smartpad_controller import SmartPadController
+
+PORT_POLL_INTERVAL_S = 2.0 # How often the output port list is re-enumerated
+PORT_MONITOR_STOP_TIMEOUT_S = 1.0
+
+
+class MidiPortMonitor(QObject):
+    """
+    Enumerates MIDI output ports on a background thread and keeps the latest list cached,
+    so the GUI never waits on the MIDI backend just to fill a combo box.
+    Differences between polls are reported as ports_added / ports_removed (hotplug);
+    ports_changed carries the full new list. Signals are emitted from the monitor thread
+    and delivered queued to GUI-thread slots.
+    """
+    ports_changed = pyqtSignal(list) # Full, current port list
+    ports_added = pyqtSignal(list) # Port names that appeared since the last poll
+    ports_removed = pyqtSignal(list) # Port names that disappeared since the last poll
+
+    def __init__(self, poll_interval_s: float = PORT_POLL_INTERVAL_S, parent=None):
+        super().__init__(parent)
+        self.poll_interval_s = poll_interval_s
+        self._lock = threading.Lock()
+        self._cached_ports: list[str] = []
+        self._has_scanned = False
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SmartPadPortMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = PORT_MONITOR_STOP_TIMEOUT_S) -> None:
+        """Stops polling. A backend call already in progress is not waited on past the timeout."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def refresh_now(self) -> None:
+        """Asks the monitor thread to re-enumerate right away instead of at the next poll."""
+        self._wake_event.set()
+
+    def get_cached_ports(self) -> list[str]:
+        """The port list from the most recent poll (empty until the first one finishes)."""
+        with self._lock:
+            return list(self._cached_ports)
+
+    def has_scanned(self) -> bool:
+        with self._lock:
+            return self._has_scanned
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._poll()
+            self._wake_event.wait(self.poll_interval_s)
+            self._wake_event.clear()
+
+    def _poll(self) -> None:
+        ports = SmartPadController.get_available_ports(verbose=False)
+        with self._lock:
+            previous = self._cached_ports
+            first_scan = not self._has_scanned
+            self._cached_ports = ports
+            self._has_scanned = True
+        if self._stop_event.is_set():
+            return
+        added = [name for name in ports if name not in previous]
+        removed = [name for name in previous if name not in ports]
+        if first_scan or added or removed:
+            self.ports_changed.emit(list(ports))
+        if removed:
+            print(f"INFO: MIDI output port(s) removed: {removed}")
+            self.ports_removed.emit(removed)
+        if added and not first_scan: # The initial list is not a hotplug event
+            print(f"INFO: MIDI output port(s) added: {added}")
+            self.ports_added.emit(added)
@@ -0,0 +1,263 @@
+# MidiPlusSmartPadRGBEditor/core/output_calibration.py
+
+import threading
+import time
+from typing import Callable
+
+from PyQt6.QtCore import QSettings
+
+from core.output_rate_limiter import DEFAULT_MESSAGES_PER_SECOND
+
+# Same QSettings identity as MainWindow, so calibration lives next to the other app settings
+SETTINGS_ORGANIZATION = "SmartPadAppDev"
+SETTINGS_APPLICATION = "MidiPlus SmartPad RGB Editor"
+CALIBRATION_SETTINGS_GROUP = "outputCalibration"
+
+# Sweep grid. Delays are the Note Off -> Note On gap (inter_command_delay); batch sizes are
+# how many messages may go out back-to-back before the rate limiter spaces them out. Each
+# setting is measured under the rate budget it will be saved with, so the batch size counts.
+CALIBRATION_DELAYS_S = [0.0, 0.0005, 0.001, 0.002, 0.005, 0.01]
+CALIBRATION_BATCH_SIZES = [128, 64, 32, 16]
+CALIBRATION_PATTERN_REPEATS = 3
+CALIBRATION_FRAME_TIMEOUT_S = 2.0 # A frame that takes longer than this to drain counts as failed
+
+CALIBRATION_COLORS = ["WHITE", "YELLOW", "LIGHTBLUE", "PURPLE", "DARKBLUE", "GREEN", "RED"]
+
+
+def calibration_test_patterns(rows: int = 8, cols: int = 8) -> list[list[str]]:
+    """Known frames for calibration: both checkerboard phases, then every color on the full grid."""
+    patterns = []
+    for phase in range(2):
+        patterns.append(["RED" if (i // cols + i % cols + phase) % 2 == 0 else "GREEN" for i in range(rows * cols)])
+    for color in CALIBRATION_COLORS:
+        patterns.append([color] * (rows * cols))
+    return patterns
+
+
+def frame_message_count(frame: list[str], direct_overwrite: bool) -> int:
+    """Messages a full refresh of this frame takes: one per pad when overwriting directly, else Off + On."""
+    return len(frame) if direct_overwrite else len(frame) + sum(1 for color in frame if color != "OFF")
+
+
+def _to_bool(value) -> bool:
+    # Booleans inside a QSettings map may come back as "true"/"false" strings on INI backends
+    return value.lower() in ("true", "1") if isinstance(value, str) else bool(value)
+
+
+def _settings_key(port_name: str) -> str:
+    # QSettings treats "/" and "\" as group separators; port names may contain either
+    return port_name.replace("/", "_").replace("\\", "_")
+
+
+def load_port_calibration(port_name: str) -> dict | None:
+    """Returns the saved calibration for a port ({"inter_command_delay", "burst_messages", "direct_overwrite", ...}) or None."""
+    settings = QSettings(SETTINGS_ORGANIZATION, SETTINGS_APPLICATION)
+    settings.beginGroup(CALIBRATION_SETTINGS_GROUP)
+    value = settings.value(_settings_key(port_name))
+    settings.endGroup()
+    if not isinstance(value, dict):
+        return None
+    try:
+        calibration = {
+            "inter_command_delay": float(value["inter_command_delay"]),
+            # Calibrations saved before this key existed had a gap-inflated rate under "messages_per_second"; not used
+            "measured_messages_per_second": float(value.get("measured_messages_per_second", 0.0)),
+            "frame_time_ms": float(value.get("frame_time_ms", 0.0)),
+            "direct_overwrite": _to_bool(value.get("direct_overwrite", False)),
+        }
+        # Older calibrations swept the batch size with throttling off, so their burst size was noise; keep defaults
+        if "rate_limit_messages_per_second" in value:
+            calibration["messages_per_second"] = float(value["rate_limit_messages_per_second"])
+            calibration["burst_messages"] = int(value["burst_messages"])
+        return calibration
+    except (KeyError, TypeError, ValueError):
+        print(f"Warning: Ignoring unreadable calibration for port '{port_name}'.")
+        return None
+
+
+def save_port_calibration(port_name: str, calibration: dict) -> None:
+    settings = QSettings(SETTINGS_ORGANIZATION, SETTINGS_APPLICATION)
+    settings.beginGroup(CALIBRATION_SETTINGS_GROUP)
+    entry = {
+        "inter_command_delay": float(calibration["inter_command_delay"]),
+        "measured_messages_per_second": float(calibration.get("measured_messages_per_second", 0.0)),
+        "frame_time_ms": float(calibration.get("frame_time_ms", 0.0)),
+        "direct_overwrite": bool(calibration.get("direct_overwrite", False)),
+    }
+    if "messages_per_second" in calibration and "burst_messages" in calibration: # The throttle is saved as a pair
+        entry["rate_limit_messages_per_second"] = float(calibration["messages_per_second"])
+        entry["burst_messages"] = int(calibration["burst_messages"])
+    settings.setValue(_settings_key(port_name), entry)
+    settings.endGroup()
+
+
+class OutputCalibrationRun(threading.Thread):
+    """
+    Sweeps inter_command_delay and burst size on a connected SmartPadController, sending the
+    calibration test patterns as full refreshes and timing how long each takes to drain.
+    Every setting runs under the controller's current rate budget (the default if throttling
+    is off), and that budget is returned with the burst size, so the saved frame time is the
+    one reached at runtime.
+    A setting passes when every frame drains without send errors and verify_frame reports
+    the expected frame on the device. A verifier is required: USB sends practically never
+    fail, so "delivered without errors" alone would pass the fastest setting even when the
+    device drops every Note On. The fastest passing setting is returned through
+    on_finished; on_progress receives (step, total_steps, description).
+    """
+
+    def __init__(self, controller,
+                 verify_frame: Callable[[list[str]], bool],
+                 on_progress: Callable[[int, int, str], None] | None = None,
+                 on_finished: Callable[[dict | None], None] | None = None,
+                 delays_s: list[float] | None = None,
+                 batch_sizes: list[int] | None = None):
+        super().__init__(name="SmartPadCalibration", daemon=True)
+        self._controller = controller
+        self._verify_frame = verify_frame
+        self._on_progress = on_progress
+        self._on_finished = on_finished
+        self._delays_s = sorted(delays_s or CALIBRATION_DELAYS_S)
+        self._batch_sizes = sorted(batch_sizes or CALIBRATION_BATCH_SIZES, reverse=True)
+        self._cancel_event = threading.Event()
+        self.results: list[dict] = [] # One entry per tried setting
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:
+        controller = self._controller
+        saved_settings = controller.get_output_settings()
+        best = None
+        try:
+            patterns = calibration_test_patterns(controller.profile.grid_rows, controller.profile.grid_cols)
+            total_steps = len(self._batch_sizes) * len(self._delays_s)
+            step = 0
+            controller.delta_mode = False # Every test frame must be a full refresh
+            controller.direct_overwrite = False # Timing is swept for the Off+On sequence every device supports
+            # The budget the result will be applied with; burst size only matters under a budget
+            rate = saved_settings["messages_per_second"] or DEFAULT_MESSAGES_PER_SECOND
+            for batch_size in self._batch_sizes:
+                for delay_s in self._delays_s:
+                    if self._cancel_event.is_set() or not controller.is_connected():
+                        return
+                    step += 1
+                    self._report_progress(step, total_steps, f"delay {delay_s * 1000:.1f} ms, batch {batch_size}")
+                    result = self._try_setting(patterns, delay_s, batch_size, rate)
+                    self.results.append(result)
+                    if result["passed"]:
+                        if best is None or result["frame_time_ms"] < best["frame_time_ms"]:
+                            best = result
+                        break # Larger delays at this batch size can only be slower
+        finally:
+            controller.apply_output_settings(saved_settings)
+            if self._on_finished:
+                self._on_finished(None if self._cancel_event.is_set() else best)
+
+    def _try_setting(self, patterns: list[list[str]], delay_s: float, batch_size: int, rate: float) -> dict:
+        controller = self._controller
+        controller.inter_command_delay = delay_s
+        controller.set_output_rate_limit(rate, burst_messages=batch_size)
+        errors_before = controller.get_send_error_count()
+        frame_times = []
+        passed = True
+        message_count = 0
+        gap_total_s = 0.0 # Off/On gaps inside the frame times; not part of the port's message rate
+        for _ in range(CALIBRATION_PATTERN_REPEATS):
+            for frame in patterns:
+                start = time.perf_counter()
+                controller.set_all_pads_from_color_names(frame, silent=True)
+                drained = controller.wait_for_output(CALIBRATION_FRAME_TIMEOUT_S)
+                frame_times.append(time.perf_counter() - start)
+                message_count += frame_message_count(frame, False)
+                if any(color != "OFF" for color in frame):
+                    gap_total_s += delay_s * 2
+                if not drained or controller.get_send_error_count() != errors_before:
+                    passed = False
+                elif not self._verify_frame(frame):
+                    passed = False
+                if not passed or self._cancel_event.is_set():
+                    break
+            if not passed or self._cancel_event.is_set():
+                break
+        total_s = sum(frame_times)
+        send_s = total_s - gap_total_s
+        return {
+            "inter_command_delay": delay_s,
+            "burst_messages": batch_size,
+            "messages_per_second": rate,
+            "passed": passed and not self._cancel_event.is_set(),
+            "frame_time_ms": total_s / len(frame_times) * 1000.0 if frame_times else 0.0,
+            # Messages/s achieved under this throttle, gaps excluded: a cost-model input, not a rate budget
+            "measured_messages_per_second": message_count / send_s if send_s > 0 else 0.0,
+        }
+
+    def _report_progress(self, step: int, total_steps: int, description: str) -> None:
+        if self._on_progress:
+            self._on_progress(step, total_steps, description)
+
+
+class DirectOverwriteVerification(threading.Thread):
+    """
+    Runs the calibration test patterns twice on a connected SmartPadController, with the
+    current timing: first with the normal Note Off + Note On sequence, then in
+    direct-overwrite mode (one Note On per color change). Every frame is checked with
+    verify_frame, so direct overwrite counts as supported only if the device shows the same
+    frames both ways. Consecutive patterns recolor lit pads, which is exactly what direct
+    overwrite changes. on_finished receives per-mode results, or None if cancelled.
+    """
+
+    def __init__(self, controller, verify_frame: Callable[[list[str]], bool],
+                 on_progress: Callable[[int, int, str], None] | None = None,
+                 on_finished: Callable[[dict | None], None] | None = None):
+        super().__init__(name="SmartPadDirectOverwriteCheck", daemon=True)
+        self._controller = controller
+        self._verify_frame = verify_frame
+        self._on_progress = on_progress
+        self._on_finished = on_finished
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:
+        controller = self._controller
+        saved_settings = controller.get_output_settings()
+        results = None
+        try:
+            patterns = calibration_test_patterns(controller.profile.grid_rows, controller.profile.grid_cols)
+            controller.delta_mode = False # Full refreshes, so both modes send every pad
+            results = {}
+            for step, (label, direct) in enumerate((("paired", False), ("direct", True)), start=1):
+                if self._on_progress:
+                    self._on_progress(step, 2, "Note Off + Note On" if not direct else "direct overwrite")
+                controller.direct_overwrite = direct
+                controller.clear_all_pads_on_device(silent=True) # Same starting point for both runs
+                passed, frame_time_ms = self._run_patterns(patterns)
+                if self._cancel_event.is_set() or not controller.is_connected():
+                    results = None
+                    return
+                results[f"{label}_passed"] = passed
+                results[f"{label}_frame_time_ms"] = frame_time_ms
+                results[f"{label}_messages_per_frame"] = sum(frame_message_count(f, direct) for f in patterns) / len(patterns)
+        finally:
+            controller.apply_output_settings(saved_settings)
+            if self._on_finished:
+                self._on_finished(results)
+
+    def _run_patterns(self, patterns: list[list[str]]) -> tuple[bool, float]:
+        controller = self._controller
+        errors_before = controller.get_send_error_count()
+        total_s = 0.0
+        frames_sent = 0
+        for _ in range(CALIBRATION_PATTERN_REPEATS):
+            for frame in patterns:
+                if self._cancel_event.is_set():
+                    return False, 0.0
+                start = time.perf_counter()
+                controller.set_all_pads_from_color_names(frame, silent=True)
+                drained = controller.wait_for_output(CALIBRATION_FRAME_TIMEOUT_S)
+                total_s += time.perf_counter() - start
+                frames_sent += 1
+                if not drained or controller.get_send_error_count() != errors_before or not self._verify_frame(frame):
+                    return False, total_s / frames_sent * 1000.0
+        return True, total_s / frames_sent * 1000.0
@@ -0,0 +1,110 @@
+# MidiPlusSmartPadRGBEditor/core/output_metrics.py
+
+import threading
+import time
+from collections import deque
+
+RATE_WINDOW_S = 1.0 # Messages/s and frames/s are averaged over this trailing window
+# Upper bounds (microseconds) of the send-call latency histogram buckets; the last bucket is open-ended
+SEND_LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class OutputMetrics:
+    """
+    Thread-safe counters and histograms for the MIDI output path: messages and bytes sent,
+    per-message send-call latency, frames delivered per second, frames skipped and send
+    errors. The output worker records; anyone may call snapshot().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._started = time.perf_counter()
+            self._messages_sent = 0
+            self._bytes_sent = 0
+            self._send_errors = 0
+            self._frames_delivered = 0
+            self._frames_skipped = 0
+            self._frames_late = 0
+            self._resync_pads_sent = 0
+            self._latency_buckets = [0] * (len(SEND_LATENCY_BUCKETS_US) + 1)
+            self._latency_total_us = 0.0
+            self._latency_max_us = 0.0
+            self._recent_sends: deque[tuple[float, int]] = deque() # (time, message_count) within the rate window
+            self._recent_frames: deque[float] = deque()
+
+    def record_send(self, message_count: int, byte_count: int, latencies_us: list[float]) -> None:
+        """Records one chunk of successfully sent messages and each message's send-call time."""
+        now = time.perf_counter()
+        with self._lock:
+            self._messages_sent += message_count
+            self._bytes_sent += byte_count
+            buckets = self._latency_buckets
+            for latency in latencies_us:
+                index = 0
+                while index < len(SEND_LATENCY_BUCKETS_US) and latency > SEND_LATENCY_BUCKETS_US[index]:
+                    index += 1
+                buckets[index] += 1
+                self._latency_total_us += latency
+                if latency > self._latency_max_us:
+                    self._latency_max_us = latency
+            self._recent_sends.append((now, message_count))
+            self._prune_locked(now)
+
+    def record_send_error(self) -> None:
+        with self._lock:
+            self._send_errors += 1
+
+    def record_frame_delivered(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self._frames_delivered += 1
+            self._recent_frames.append(now)
+            self._prune_locked(now)
+
+    def record_frames_skipped(self, count: int = 1, late: bool = False) -> None:
+        """Frames never sent: superseded by a newer frame, dropped from a full queue, or late (past their deadline)."""
+        with self._lock:
+            self._frames_skipped += count
+            if late:
+                self._frames_late += count
+
+    def record_resync(self, pad_count: int) -> None:
+        """Pads resent by the delta-mode resync slice although the mirror said they were already correct."""
+        with self._lock:
+            self._resync_pads_sent += pad_count
+
+    def _prune_locked(self, now: float) -> None:
+        cutoff = now - RATE_WINDOW_S
+        while self._recent_sends and self._recent_sends[0][0] < cutoff:
+            self._recent_sends.popleft()
+        while self._recent_frames and self._recent_frames[0] < cutoff:
+            self._recent_frames.popleft()
+
+    def snapshot(self) -> dict:
+        """A consistent copy of all metrics. Histogram keys are bucket upper bounds in us ("inf" = above the last)."""
+        now = time.perf_counter()
+        with self._lock:
+            self._prune_locked(now)
+            window = min(RATE_WINDOW_S, max(now - self._started, 1e-6))
+            measured_messages = self._messages_sent
+            histogram = {str(bound): count for bound, count in zip(SEND_LATENCY_BUCKETS_US, self._latency_buckets)}
+            histogram["inf"] = self._latency_buckets[-1]
+            return {
+                "uptime_s": now - self._started,
+                "messages_sent": self._messages_sent,
+                "bytes_sent": self._bytes_sent,
+                "send_errors": self._send_errors,
+                "frames_delivered": self._frames_delivered,
+                "frames_skipped": self._frames_skipped,
+                "frames_late": self._frames_late,
+                "resync_pads_sent": self._resync_pads_sent,
+                "messages_per_second": sum(n for _, n in self._recent_sends) / window,
+                "frames_per_second": len(self._recent_frames) / window,
+                "send_latency_mean_us": self._latency_total_us / measured_messages if measured_messages else 0.0,
+                "send_latency_max_us": self._latency_max_us,
+                "send_latency_histogram_us": histogram,
+            }
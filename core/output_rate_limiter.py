@@ -0,0 +1,79 @@
+# MidiPlusSmartPadRGBEditor/core/output_rate_limiter.py
+
+import time
+
+# Default output budget. This is a guess, not a measured SmartPad limit: the send-call timing
+# below is microseconds on rtmidi and says nothing about what the unit can display, so until
+# output calibration has measured the port, the throughput model (and the playback speed cap)
+# rests on this figure alone. Tune per unit via SmartPadController.set_output_rate_limit().
+DEFAULT_MESSAGES_PER_SECOND = 10000
+DEFAULT_BURST_MESSAGES = 256  # Two full frames may go out back-to-back before throttling kicks in
+MEASURED_RATE_SMOOTHING = 0.05 # EWMA weight for the observed per-message send time
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket that caps how many MIDI messages per second reach the port,
+    plus a small throughput model used to predict how long a frame takes to send.
+    A rate of 0 disables throttling. Used from the output worker thread only;
+    the settings may be changed from any thread.
+    """
+
+    def __init__(self, messages_per_second: float = DEFAULT_MESSAGES_PER_SECOND,
+                 burst_messages: int = DEFAULT_BURST_MESSAGES):
+        self.messages_per_second = float(messages_per_second)
+        self.burst_messages = max(1, int(burst_messages))
+        self._tokens = float(self.burst_messages)
+        self._last_refill = time.perf_counter()
+        self._measured_seconds_per_message: float | None = None
+        # Port throughput found by output calibration (Off/On gaps excluded); feeds the model only
+        self.calibrated_messages_per_second: float | None = None
+
+    def reserve(self, message_count: int) -> float:
+        """
+        Takes message_count tokens and returns how many seconds the caller must wait
+        before sending them (0.0 if they fit in the bucket right now).
+        """
+        rate = self.messages_per_second
+        if rate <= 0:
+            return 0.0
+        now = time.perf_counter()
+        self._tokens = min(float(self.burst_messages), self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+        self._tokens -= message_count
+        return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    def refund(self, message_count: int) -> None:
+        """Returns tokens reserved for messages that were not sent after all (e.g. a preempted chunk)."""
+        if message_count > 0 and self.messages_per_second > 0:
+            self._tokens = min(float(self.burst_messages), self._tokens + message_count)
+
+    def record_send_time(self, message_count: int, elapsed_s: float) -> None:
+        """
+        Feeds the measured cost of an actual port write into the throughput model. This is only
+        the time of the send call (what the driver accepts), not what the device keeps up with.
+        """
+        if message_count <= 0:
+            return
+        per_message = elapsed_s / message_count
+        if self._measured_seconds_per_message is None:
+            self._measured_seconds_per_message = per_message
+        else:
+            self._measured_seconds_per_message += MEASURED_RATE_SMOOTHING * (per_message - self._measured_seconds_per_message)
+
+    def measured_messages_per_second(self) -> float | None:
+        """Throughput the port has actually achieved so far, or None before the first send."""
+        if not self._measured_seconds_per_message:
+            return None
+        return 1.0 / self._measured_seconds_per_message
+
+    def effective_messages_per_second(self) -> float | None:
+        """The lowest of the configured budget and the calibrated and measured port throughput (None = unbounded)."""
+        candidates = [r for r in (self.messages_per_second, self.calibrated_messages_per_second,
+                                  self.measured_messages_per_second()) if r and r > 0]
+        return min(candidates) if candidates else None
+
+    def predict_send_time_s(self, message_count: int, fixed_overhead_s: float = 0.0) -> float:
+        """Predicted wall time to deliver message_count messages at the effective rate."""
+        rate = self.effective_messages_per_second()
+        return fixed_overhead_s + (message_count / rate if rate else 0.0)
@@ -0,0 +1,129 @@
+# MidiPlusSmartPadRGBEditor/core/playback_scheduler.py
+
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.precise_timing import wait_until
+
+PLAYBACK_LOOKAHEAD_FRAMES = 3 # Frames normalized ahead of their release time
+PLAYBACK_STOP_TIMEOUT_S = 1.0
+
+
+class PlaybackScheduler(QObject):
+    """
+    Releases animation frames to a SmartPadController at fixed perf_counter() deadlines
+    (start + n * period) on its own thread, so GUI load and send time never shift the
+    schedule. The next few frames are prepared ahead of their deadline; each release waits
+    with a coarse sleep followed by a short spin. Per-frame timing error (release time minus
+    deadline) is reported with frame_released and summarized by get_timing_stats().
+    If the thread falls more than a whole period behind, the missed slots are skipped rather
+    than sent in a burst. Signals are emitted from the scheduler thread.
+    """
+    frame_released = pyqtSignal(int, float) # frame index, timing error in ms (positive = late)
+    playback_finished = pyqtSignal() # Emitted when a non-looping animation has played its last frame
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loop = False
+        self._reset_timing_stats()
+
+    def start(self, frames: list[list[str]], period_ms: int, loop: bool, start_index: int = 0) -> bool:
+        """Starts releasing a snapshot of frames every period_ms. Returns False if there is nothing to play."""
+        self.stop()
+        if not frames or period_ms <= 0:
+            return False
+        self._reset_timing_stats()
+        self._stop_event.clear()
+        self._loop = loop
+        frames = [list(frame) for frame in frames] # Snapshot; edits stop playback anyway
+        start_index = start_index if 0 <= start_index < len(frames) else 0
+        self._thread = threading.Thread(target=self._run, args=(frames, period_ms / 1000.0, start_index),
+                                        name="SmartPadPlayback", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float | None = PLAYBACK_STOP_TIMEOUT_S) -> None:
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def set_loop(self, loop: bool) -> None:
+        """Takes effect at the next wrap-around, like toggling loop on the model during playback."""
+        self._loop = loop
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_timing_stats(self) -> dict:
+        """Release timing of the current/last run: frames released, mean/max absolute error (ms), slots skipped."""
+        with self._lock:
+            released = self._frames_released
+            return {
+                "frames_released": released,
+                "mean_abs_error_ms": self._abs_error_total_ms / released if released else 0.0,
+                "max_abs_error_ms": self._max_abs_error_ms,
+                "slots_skipped": self._slots_skipped,
+            }
+
+    def _reset_timing_stats(self) -> None:
+        with self._lock:
+            self._frames_released = 0
+            self._abs_error_total_ms = 0.0
+            self._max_abs_error_ms = 0.0
+            self._slots_skipped = 0
+
+    def _record_release(self, error_ms: float) -> None:
+        with self._lock:
+            self._frames_released += 1
+            self._abs_error_total_ms += abs(error_ms)
+            self._max_abs_error_ms = max(self._max_abs_error_ms, abs(error_ms))
+
+    def _run(self, frames: list[list[str]], period_s: float, index: int) -> None:
+        frame_count = len(frames)
+        prepared: set[int] = set() # Frame indices already normalized into the controller's frame cache
+        slot = 0
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            # Prepare the next few frames while there is still time before the deadline
+            for ahead in range(PLAYBACK_LOOKAHEAD_FRAMES):
+                ahead_index = index + ahead
+                if self._loop:
+                    ahead_index %= frame_count
+                elif ahead_index >= frame_count:
+                    break
+                if ahead_index not in prepared:
+                    self.controller.prepare_frame(frames[ahead_index])
+                    prepared.add(ahead_index)
+
+            deadline = start + slot * period_s
+            if not wait_until(deadline, self._stop_event):
+                return
+            released = time.perf_counter()
+            # The frame must start going out before the next slot, or the output path drops it as late
+            self.controller.set_all_pads_from_color_names(frames[index], silent=True, deadline=deadline + period_s)
+            error_ms = (released - deadline) * 1000.0
+            self._record_release(error_ms)
+            self.frame_released.emit(index, error_ms)
+            prepared.discard(index) # Re-prepared on the next loop, in case it aged out of the cache meanwhile
+
+            # Advance to the next slot; slots that have already fully passed are skipped, not burst out
+            next_slot = slot + 1
+            behind = int((time.perf_counter() - start) / period_s) - next_slot
+            if behind > 0:
+                next_slot += behind
+                with self._lock:
+                    self._slots_skipped += behind
+            index += next_slot - slot
+            slot = next_slot
+            if index >= frame_count:
+                if not self._loop:
+                    self.playback_finished.emit()
+                    return
+                index %= frame_count
@@ -0,0 +1,25 @@
+# MidiPlusSmartPadRGBEditor/core/precise_timing.py
+
+import threading
+import time
+
+# Sleep until this close to a deadline, then spin on perf_counter() for the rest. OS sleeps
+# can overshoot by a few ms (up to ~15 ms on Windows), the spin absorbs that.
+SPIN_THRESHOLD_S = 0.002
+
+
+def wait_until(deadline: float, stop_event: threading.Event | None = None) -> bool:
+    """
+    Waits until perf_counter() reaches deadline: a coarse sleep (interruptible through
+    stop_event, if given), then a short spin. Returns False if stop_event was set meanwhile.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_THRESHOLD_S:
+        if stop_event is not None:
+            if stop_event.wait(remaining - SPIN_THRESHOLD_S):
+                return False
+        else:
+            time.sleep(remaining - SPIN_THRESHOLD_S)
+    while time.perf_counter() < deadline:
+        pass
+    return stop_event is None or not stop_event.is_set()
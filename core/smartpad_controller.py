@@ -1,10 +1,28 @@
 # MidiPlusSmartPadRGBEditor/core/smartpad_controller.py
 
+import functools
+import itertools
+import threading
 import mido
 import time
-from PyQt6.QtCore import QObject, pyqtSignal
+from typing import Callable, NamedTuple
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+from core.midi_output_worker import MidiOutputWorker
+from core.output_rate_limiter import DEFAULT_BURST_MESSAGES, DEFAULT_MESSAGES_PER_SECOND, TokenBucketRateLimiter
+from core.output_metrics import OutputMetrics
+from core.frame_buffer_cache import FrameBufferCache
+from core.device_profile import DeviceProfile, load_device_profiles
+from core.output_calibration import (
+    DirectOverwriteVerification, OutputCalibrationRun, load_port_calibration, save_port_calibration
+)
+from core.midi_capture import MidiCaptureRecorder, MidiCaptureReplayer
+from core.midi_input_listener import MidiInputListener
+from core.smartpad_emulator import EmulatedSmartPadPort, get_emulated_port_names, is_emulated_port_name, open_emulated_port
 
 # --- SmartPad Configuration (from MidiPlusSmartPadEditor.py findings) ---
+# These are the built-in default device profile (see core.device_profile); devices described
+# in resources/device_profiles/*.json are picked by port name on connect.
 SMARTPAD_KEYWORDS = ["smartpad", "midiplus", "usb midi"]
 TARGET_MIDI_CHANNEL = 0  # Typically channel 0 (which is MIDI channel 1)
 
@@ -37,8 +55,95 @@ PAD_GRID_NOTES = [
 # Delay between sending Note Off and subsequent Note On.
 # Can be 0.0 if the hardware handles rapid messages well.
 # The Tkinter script used 0.02. Let's start with a small configurable value.
+# calibrate() finds the real minimum per unit and it is restored on connect.
 DEFAULT_INTER_COMMAND_DELAY = 0.001 # 1 ms, very short. Can be tuned.
 
+PAD_COUNT = 64
+
+# --- Precomputed output tables ---
+# Every message a device can be sent is built once, when its profile is created, so the send
+# path is a plain table lookup: no mido.Message construction, note arithmetic or color-name
+# lookups per frame. The module-level tables below are the default profile's.
+DEFAULT_DEVICE_PROFILE = DeviceProfile("MIDIPLUS SmartPad", SMARTPAD_KEYWORDS, TARGET_MIDI_CHANNEL,
+                                       PAD_GRID_NOTES, COLOR_TO_VELOCITY)
+NOTE_OFF_BYTES = DEFAULT_DEVICE_PROFILE.note_off_bytes
+# NOTE_ON_BYTES[pad][color_name] -> Note On triple; "OFF" is absent since it is sent as a Note Off.
+NOTE_ON_BYTES = DEFAULT_DEVICE_PROFILE.note_on_bytes
+
+OUTPUT_DRAIN_TIMEOUT_S = 1.0 # Max time disconnect() waits for queued messages to reach the port
+CALIBRATION_CANCEL_TIMEOUT_S = 3.0
+CONNECTION_CLOSE_TIMEOUT_S = 2.0 # Max time shutdown paths wait for an async disconnect to finish
+METRICS_UPDATE_INTERVAL_MS = 1000 # How often metrics_updated is emitted
+# Reopening a port that failed mid-send: the wait doubles after each failed attempt, up to the cap.
+# After the last attempt the controller gives up and disconnects (hotplug auto-reconnect still applies).
+RECONNECT_INITIAL_DELAY_S = 0.25
+RECONNECT_MAX_DELAY_S = 4.0
+RECONNECT_MAX_ATTEMPTS = 10
+# Delta-mode frames also rewrite this many grid rows, rotating, so a message the device missed
+# is healed within rows / N frames (8 frames on the SmartPad) instead of never
+DELTA_RESYNC_ROWS_PER_FRAME = 1
+
+
+class CompiledFrame(NamedTuple):
+    """A frame encoded into ready-to-send (pad, message) bursts; see compile_frame()."""
+    pads: tuple[int, ...] # Pads the frame writes
+    first_burst: list[tuple[int, bytes]] # Sent right away
+    follow_ups: list[tuple[int, bytes]] # Sent after the Off/On gap (empty in direct-overwrite mode)
+    message_count: int
+
+
+def compile_frame(pads, target_state: tuple[str, ...], direct_overwrite: bool,
+                  profile: DeviceProfile = DEFAULT_DEVICE_PROFILE) -> CompiledFrame:
+    """
+    Encodes the given pads of a normalized frame: Note Offs, then Note Ons for the pads not
+    "OFF" (for those the Note Off is sufficient), or one message per pad in direct-overwrite mode.
+    """
+    pads = tuple(pads)
+    if direct_overwrite:
+        direct_pad_bytes = profile.direct_pad_bytes
+        first_burst = [(i, direct_pad_bytes[i][target_state[i]]) for i in pads]
+        follow_ups = []
+    else:
+        note_off_bytes, note_on_bytes = profile.note_off_bytes, profile.note_on_bytes
+        first_burst = [(i, note_off_bytes[i]) for i in pads]
+        follow_ups = [(i, note_on_bytes[i][target_state[i]]) for i in pads if target_state[i] != "OFF"]
+    return CompiledFrame(pads, first_burst, follow_ups, len(first_burst) + len(follow_ups))
+
+
+class _CoalescedFrameJob:
+    """
+    Output worker job carrying the newest frame submitted since it was queued. While it
+    is the last job in the queue, newer frames replace its frame instead of queuing
+    another job, so a backlog never builds up behind a slow port (latest frame wins).
+    """
+    __slots__ = ("controller", "frame", "started")
+
+    def __init__(self, controller: "SmartPadController", frame: tuple[tuple[str, ...], bool, float | None, int]):
+        self.controller = controller
+        self.frame = frame # (target_state, silent, deadline, submit_serial)
+        self.started = False
+
+    def __call__(self) -> None:
+        self.controller._write_coalesced_frame(self)
+
+
+class _CoalescedPadJob:
+    """
+    Output worker job for single-pad writes. While it is the last job in the queue,
+    further pad writes merge into it keyed by pad (last write wins), and the whole
+    batch goes out as one burst of Note Offs followed by one paced burst of Note Ons.
+    """
+    __slots__ = ("controller", "pad_colors", "silent", "started")
+
+    def __init__(self, controller: "SmartPadController", silent: bool):
+        self.controller = controller
+        self.pad_colors: dict[int, str] = {} # pad index -> color name, in first-write order
+        self.silent = silent
+        self.started = False
+
+    def __call__(self) -> None:
+        self.controller._write_coalesced_pads(self)
+
 
 class SmartPadController(QObject):
     """
@@ -46,24 +151,135 @@ class SmartPadController(QObject):
     """
     connection_status_changed = pyqtSignal(bool, str)  # is_connected, port_name_or_message
     error_occurred = pyqtSignal(str) # For reporting general errors
+    output_queue_depth_changed = pyqtSignal(int) # Jobs waiting for the MIDI output worker
+    output_overrun = pyqtSignal(float, int) # predicted_frame_send_ms, frame_period_ms
+    calibration_progress = pyqtSignal(int, int, str) # step, total_steps, description
+    calibration_finished = pyqtSignal(bool, dict) # success, chosen settings (empty on failure/cancel)
+    direct_overwrite_verified = pyqtSignal(bool, dict) # direct mode matched, per-mode results (empty on cancel)
+    capture_replay_finished = pyqtSignal(int, float) # messages_sent, worst_lateness_ms
+    metrics_updated = pyqtSignal(dict) # Periodic get_metrics_snapshot()
+    connection_pending_changed = pyqtSignal(bool, str) # is_pending, description ("Connecting to ...")
+    pads_cleared = pyqtSignal() # A queued clear_all_pads_on_device() has been written to the port
+    reconnect_state_changed = pyqtSignal(bool, str) # is_reconnecting, description
+    pad_pressed = pyqtSignal(int, int) # pad_index, velocity; emitted from the MIDI input thread
+    pad_released = pyqtSignal(int) # pad_index; emitted from the MIDI input thread
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._midi_port: mido.ports.BaseOutput | None = None
+        self._raw_send = None # Set on connect by _resolve_raw_sender()
         self._port_name_used: str | None = None
         self.inter_command_delay: float = DEFAULT_INTER_COMMAND_DELAY
+        # Device profile: grid size, note map, channel, palette and the precompiled message tables.
+        # Chosen on connect by port name from resources/device_profiles, else the built-in default.
+        self.device_profiles: list[DeviceProfile] = load_device_profiles()
+        self.profile: DeviceProfile = DEFAULT_DEVICE_PROFILE
+
+        # Delta mode: only pads whose color differs from what we last sent are updated.
+        # _device_state mirrors the last color name sent to each pad; None means "unknown"
+        # (e.g. right after connecting or after a send error) and forces a full refresh.
+        self.delta_mode: bool = False
+        # Resync: each delta frame also resends a rotating slice of rows (0 disables), so the
+        # whole device is rewritten every few frames even if the mirror and the pads disagree.
+        self.delta_resync_rows: int = DELTA_RESYNC_ROWS_PER_FRAME
+        self._resync_row: int = 0 # First row of the next resync slice
+        # Direct overwrite: change a pad's color with a single Note On at the new velocity instead
+        # of Note Off + Note On. Halves the traffic, but only for devices verified to support it.
+        self.direct_overwrite: bool = False
+        self._device_state: list[str | None] = [None] * self.profile.pad_count
+        self._send_error_count: int = 0
+        self._send_failing: bool = False # True after a send error, until a send succeeds again
+        # What the pads should show (last frame/edit/clear requested, normalized); resent in
+        # full after an automatic reconnect, since the device may have lost power meanwhile.
+        self._desired_state: list[str] = ["OFF"] * self.profile.pad_count
+
+        # A send error marks the port failed: it is closed and reopened with exponential backoff
+        # on a daemon thread. Meanwhile is_connected() stays True and output is discarded, so the
+        # GUI keeps working; connect()/disconnect() cancel the attempt.
+        self._reconnecting = False
+        self._reconnect_cancel: threading.Event | None = None
+
+        # Pad presses: the device's input port is opened alongside the output port, with a
+        # callback, and each note is mapped to its pad through the profile's note -> pad table.
+        self._input_note_to_pad: list[int | None] = self.profile.note_to_pad_table
+        self._input_listener = MidiInputListener(self._on_midi_input)
+
+        # All port writes happen on the output worker thread; the public set_* and clear
+        # methods only validate their input and queue a job, so they never block the GUI.
+        self._port_lock = threading.Lock()
+        self._metrics = OutputMetrics()
+        self._output_worker = MidiOutputWorker(
+            send_messages=self._send_raw_midi_messages,
+            on_queue_depth_changed=self.output_queue_depth_changed.emit,
+            on_error=self.error_occurred.emit,
+            on_job_dropped=self._on_output_job_dropped,
+        )
+        self._output_worker.start()
+
+        # Write coalescing (see _CoalescedFrameJob / _CoalescedPadJob): the tail jobs are the
+        # frame job still last in the bulk lane and the pad job still last in the priority lane.
+        # Frames that miss their deadline are dropped, but never two in a row, so an
+        # overloaded port still shows every other frame.
+        self._coalesce_lock = threading.Lock()
+        self._tail_frame_job: _CoalescedFrameJob | None = None
+        self._tail_pad_job: _CoalescedPadJob | None = None
+        self._last_frame_dropped_late = False
+
+        # Looping animations send the same frames over and over: normalized frames and their
+        # compiled message buffers are cached by content (an edited frame is simply a new key).
+        # Compiled entries are keyed by (device state or None for a full refresh, frame, direct_overwrite).
+        self._normalized_frame_cache = FrameBufferCache()
+        self._compiled_frame_cache = FrameBufferCache()
+
+        # Priority lanes: pad edits and clears overtake queued frames, so every submission
+        # gets a serial. A frame skips pads edited (and is dropped if cleared) after it was submitted.
+        self._submit_serial = itertools.count(1)
+        self._pad_edit_serial: list[int] = [0] * self.profile.pad_count
+        self._clear_serial: int = 0
+
+        # connect_async()/disconnect_async() run on a short-lived daemon thread, one at a time,
+        # so opening or closing a slow (or hung) backend never blocks the GUI or app exit.
+        self._connection_op_lock = threading.Lock()
+        self._connection_op_thread: threading.Thread | None = None
+        self._connection_op_pending = False # Cleared just before the final connection_pending_changed
+
+        # Output budget: caps messages/s at the port and predicts whether a frame fits its period
+        self._rate_limiter = TokenBucketRateLimiter()
+        self._frame_period_ms: int = 0 # Set during playback; 0 = no per-frame deadline to check
+        self._calibration_run: OutputCalibrationRun | None = None
+
+        # Opt-in capture of everything written to the port (see start_capture())
+        self._capture_recorder: MidiCaptureRecorder | None = None
+        self._capture_replayer: MidiCaptureReplayer | None = None
+
+        # Live output metrics: polled via get_metrics_snapshot(), pushed via metrics_updated.
+        # The timer needs a Qt event loop; headless scripts just poll.
+        self._metrics_timer = QTimer(self)
+        self._metrics_timer.setInterval(METRICS_UPDATE_INTERVAL_MS)
+        self._metrics_timer.timeout.connect(lambda: self.metrics_updated.emit(self.get_metrics_snapshot()))
+        if QCoreApplication.instance() is not None:
+            self._metrics_timer.start()
 
     @staticmethod
-    def get_available_ports() -> list[str]:
-        print("DEBUG SC: get_available_ports() called") # New print
+    def get_available_ports(verbose: bool = True) -> list[str]:
+        # verbose=False keeps the background port monitor from flooding the console
+        if verbose: print("DEBUG SC: get_available_ports() called") # New print
         try:
             ports = mido.get_output_names()
-            print(f"DEBUG SC: mido.get_output_names() returned: {ports}") # New print
-            return ports
+            if verbose: print(f"DEBUG SC: mido.get_output_names() returned: {ports}") # New print
         except Exception as e:
             print(f"DEBUG SC: Error in mido.get_output_names(): {e}") # New print
             # self.error_occurred.emit(f"MIDI Port Discovery Error: {e}") # Careful with emitting signals from static method
-            return []
+            ports = []
+        # Emulated SmartPads (if enabled) go last so real hardware wins auto-detection
+        return ports + get_emulated_port_names()
+
+    @staticmethod
+    def _open_output_port(port_name: str):
+        """Opens a real mido output port, or the in-process emulator for emulated port names."""
+        if is_emulated_port_name(port_name):
+            return open_emulated_port(port_name)
+        return mido.open_output(port_name)
 
     def connect(self, port_name: str = None) -> bool:
         """
@@ -71,6 +287,7 @@ class SmartPadController(QObject):
         If port_name is None, it tries to find a suitable port.
         Returns True on success, False on failure.
         """
+        self._cancel_reconnect()
         if self.is_connected():
             if port_name == self._port_name_used:
                 self.connection_status_changed.emit(True, f"Already connected to {self._port_name_used}")
@@ -87,11 +304,8 @@ class SmartPadController(QObject):
                 return False
 
             for p_name in available_ports:
-                for keyword in SMARTPAD_KEYWORDS:
-                    if keyword.lower() in p_name.lower():
-                        target_port_name = p_name
-                        break
-                if target_port_name:
+                if any(profile.matches_port(p_name) for profile in self.device_profiles + [DEFAULT_DEVICE_PROFILE]):
+                    target_port_name = p_name
                     break
             
             if not target_port_name:
@@ -101,11 +315,16 @@ class SmartPadController(QObject):
                 return False
             print(f"DEBUG SC: Attempting to connect to target_port_name: '{target_port_name}'") # New print
         
+        self._apply_device_profile(self.profile_for_port(target_port_name))
         try:
-            self._midi_port = mido.open_output(target_port_name)
+            self._midi_port = self._open_output_port(target_port_name)
+            self._raw_send = self._resolve_raw_sender(self._midi_port)
             self._port_name_used = target_port_name
+            self.invalidate_device_state()
+            self._apply_saved_calibration(target_port_name)
             print(f"Successfully opened MIDI port: {self._port_name_used}")
             self.connection_status_changed.emit(True, self._port_name_used)
+            self._open_input(target_port_name)
             self.clear_all_pads_on_device() # Clear pads on successful connection
             return True
         except OSError as e:
@@ -128,157 +347,878 @@ class SmartPadController(QObject):
 
     def disconnect(self, turn_all_off=True) -> None:
         """Closes the MIDI port."""
+        self._cancel_reconnect()
+        self.cancel_calibration()
+        self.cancel_capture_replay()
+        self._input_listener.close()
         if self._midi_port:
             if turn_all_off:
                 print("Turning all SmartPad pads off before closing...")
+                self._output_worker.clear_pending() # No point finishing old frames
                 self.clear_all_pads_on_device(silent=True) # silent to avoid extra prints during disconnect
-                if self.inter_command_delay > 0: # Give a moment for last commands
-                    time.sleep(self.inter_command_delay * 5 + 0.05) # A small buffer
-            try:
-                self._midi_port.close()
-                print(f"MIDI port {self._port_name_used} closed.")
-            except Exception as e:
-                print(f"Error closing MIDI port {self._port_name_used}: {e}")
-            
+            if not self._output_worker.wait_until_idle(OUTPUT_DRAIN_TIMEOUT_S):
+                print("Warning: MIDI output did not drain before closing the port.")
+                self._output_worker.clear_pending()
+            with self._port_lock:
+                try:
+                    self._midi_port.close()
+                    print(f"MIDI port {self._port_name_used} closed.")
+                except Exception as e:
+                    print(f"Error closing MIDI port {self._port_name_used}: {e}")
+                self._midi_port = None
+
         self._midi_port = None
+        self.invalidate_device_state()
         old_port_name = self._port_name_used
         self._port_name_used = None
         self.connection_status_changed.emit(False, f"Disconnected from {old_port_name}" if old_port_name else "Disconnected")
 
+    # --- Device profiles ---
+    def profile_for_port(self, port_name: str) -> DeviceProfile:
+        """The first loaded profile whose port keywords match port_name, else the built-in default."""
+        for profile in self.device_profiles:
+            if profile.matches_port(port_name):
+                return profile
+        return DEFAULT_DEVICE_PROFILE
+
+    def set_device_profile(self, profile: DeviceProfile) -> bool:
+        """Switches to another device profile. Only possible while disconnected (connect() picks one by port name)."""
+        if self.is_connected():
+            self.error_occurred.emit("Disconnect before changing the device profile.")
+            return False
+        self._apply_device_profile(profile)
+        return True
+
+    def _apply_device_profile(self, profile: DeviceProfile) -> None:
+        if profile is self.profile:
+            return
+        with self._coalesce_lock:
+            self.profile = profile
+            self._device_state = [None] * profile.pad_count
+            self._desired_state = ["OFF"] * profile.pad_count
+            self._pad_edit_serial = [0] * profile.pad_count
+            self._resync_row = 0
+            self._input_note_to_pad = profile.note_to_pad_table
+            self.direct_overwrite = profile.direct_overwrite # A saved per-port calibration overrides this
+            self._normalized_frame_cache.clear()
+            self._compiled_frame_cache.clear()
+        print(f"Using device profile: {profile.name} ({profile.grid_rows}x{profile.grid_cols}, channel {profile.channel + 1})")
+
+    # --- Asynchronous connect / disconnect ---
+    def connect_async(self, port_name: str = None) -> bool:
+        """
+        Runs connect() off the GUI thread. The result arrives through connection_status_changed;
+        connection_pending_changed brackets the operation. Returns False if another
+        connect/disconnect is still running.
+        """
+        description = f"Connecting to {port_name}..." if port_name else "Looking for SmartPad..."
+        return self._start_connection_operation(description, functools.partial(self.connect, port_name))
+
+    def disconnect_async(self, turn_all_off: bool = True) -> bool:
+        """Runs disconnect() off the GUI thread. See connect_async()."""
+        return self._start_connection_operation("Disconnecting...", functools.partial(self.disconnect, turn_all_off))
+
+    def is_connection_pending(self) -> bool:
+        with self._connection_op_lock:
+            return self._connection_op_pending
+
+    def wait_for_connection_operation(self, timeout: float | None = None) -> bool:
+        """Blocks until the running connect/disconnect finishes. Returns False on timeout."""
+        with self._connection_op_lock:
+            thread = self._connection_op_thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _start_connection_operation(self, description: str, operation: Callable[[], object]) -> bool:
+        with self._connection_op_lock:
+            if self._connection_op_pending:
+                self.error_occurred.emit("A connect/disconnect is already in progress.")
+                return False
+            self._connection_op_pending = True
+            thread = threading.Thread(target=self._run_connection_operation, args=(description, operation),
+                                      name="SmartPadConnection", daemon=True)
+            self._connection_op_thread = thread
+        self.connection_pending_changed.emit(True, description)
+        thread.start()
+        return True
+
+    def _run_connection_operation(self, description: str, operation: Callable[[], object]) -> None:
+        try:
+            operation()
+        except Exception as e:
+            print(f"Error during '{description}': {e}")
+            self.error_occurred.emit(f"MIDI connection error: {e}")
+        finally:
+            with self._connection_op_lock:
+                self._connection_op_pending = False
+            self.connection_pending_changed.emit(False, description)
+
     def is_connected(self) -> bool:
-        """Returns True if the MIDI port is open, False otherwise."""
+        """Returns True if the MIDI port is open (or being reopened after a send failure), False otherwise."""
+        return self._is_port_open() or self._reconnecting
+
+    def _is_port_open(self) -> bool:
         return self._midi_port is not None and not self._midi_port.closed
 
-    def get_connected_port_name(self) -> str | None:
-        return self._port_name_used
+    def is_reconnecting(self) -> bool:
+        return self._reconnecting
 
-    def _send_raw_midi_message(self, msg: mido.Message):
-        """Internal helper to send a message with error handling."""
-        if self.is_connected():
+    # --- Automatic reconnection after send failures ---
+    def _on_port_failed(self, error: Exception) -> None:
+        """Called with _port_lock held when a send raises: detaches the port and starts reopening it."""
+        if self._reconnecting or self._port_name_used is None:
+            return
+        failed_port, port_name = self._midi_port, self._port_name_used
+        self._midi_port = None
+        self._raw_send = None
+        self._reconnecting = True
+        cancel_event = threading.Event()
+        self._reconnect_cancel = cancel_event
+        print(f"Warning: MIDI port {port_name} failed ({error}); reconnecting...")
+        threading.Thread(target=self._reconnect_with_backoff, args=(port_name, failed_port, cancel_event),
+                         name="SmartPadReconnect", daemon=True).start()
+
+    def _cancel_reconnect(self) -> None:
+        with self._port_lock:
+            if self._reconnect_cancel is not None:
+                self._reconnect_cancel.set()
+                self._reconnect_cancel = None
+            was_reconnecting, self._reconnecting = self._reconnecting, False
+        if was_reconnecting:
+            self.reconnect_state_changed.emit(False, "Reconnect cancelled")
+
+    def _reconnect_with_backoff(self, port_name: str, failed_port, cancel_event: threading.Event) -> None:
+        try:
+            failed_port.close()
+        except Exception as e:
+            print(f"Error closing failed MIDI port {port_name}: {e}")
+        delay_s = RECONNECT_INITIAL_DELAY_S
+        for attempt in range(1, RECONNECT_MAX_ATTEMPTS + 1):
+            self.reconnect_state_changed.emit(True, f"Connection to {port_name} lost; reconnecting (attempt {attempt}/{RECONNECT_MAX_ATTEMPTS})...")
+            if cancel_event.wait(delay_s):
+                return
             try:
-                self._midi_port.send(msg)
-                # print(f"Sent: {msg}") # Optional: for heavy debugging
+                port = self._open_output_port(port_name)
             except Exception as e:
-                print(f"Error sending MIDI message {msg}: {e}")
-                # Potentially disconnect or mark port as problematic
-                # self.error_occurred.emit(f"MIDI send error: {e}")
-                # self.disconnect(turn_all_off=False) # Risky to auto-disconnect here
-        # else:
-            # print(f"MIDI port not open. Cannot send: {msg}")
+                print(f"Reconnect attempt {attempt} to {port_name} failed: {e}")
+                delay_s = min(delay_s * 2, RECONNECT_MAX_DELAY_S)
+                continue
+            with self._port_lock:
+                if cancel_event.is_set(): # connect()/disconnect() took over while the port was opening
+                    port.close()
+                    return
+                self._midi_port = port
+                self._raw_send = self._resolve_raw_sender(port)
+                self._reconnecting = False
+                self._reconnect_cancel = None
+                self._send_failing = False
+                self.invalidate_device_state()
+            print(f"Reconnected to MIDI port: {port_name}")
+            self._open_input(port_name) # The input went away with the device too
+            # Put back everything the pads should be showing, in full
+            self.set_all_pads_from_color_names(list(self._desired_state), silent=True)
+            self.reconnect_state_changed.emit(False, f"Reconnected to {port_name}")
+            return
+        with self._port_lock:
+            if cancel_event.is_set():
+                return
+            self._reconnecting = False
+            self._reconnect_cancel = None
+        print(f"Error: Could not reopen MIDI port {port_name} after {RECONNECT_MAX_ATTEMPTS} attempts.")
+        self.reconnect_state_changed.emit(False, f"Could not reconnect to {port_name}")
+        self.error_occurred.emit(f"Lost connection to {port_name}.")
+        self.disconnect(turn_all_off=False)
+
+    def get_connected_port_name(self) -> str | None:
+        return self._port_name_used
+
+    # --- Pad input ---
+    def _open_input(self, output_port_name: str) -> None:
+        if self._input_listener.open_for_output(output_port_name, self.profile.port_keywords):
+            print(f"Listening for pad presses on MIDI input: {self._input_listener.port_name}")
+        else:
+            print(f"DEBUG SC: No MIDI input found for {output_port_name}; pad presses will not be received.")
+
+    def _on_midi_input(self, msg: mido.Message) -> None:
+        """Input callback, on the MIDI backend's thread: one table lookup, then the signal."""
+        if msg.type == 'note_on':
+            pad_index = self._input_note_to_pad[msg.note]
+            if pad_index is not None:
+                if msg.velocity > 0:
+                    self.pad_pressed.emit(pad_index, msg.velocity)
+                else:
+                    self.pad_released.emit(pad_index) # Note On with velocity 0 is a release
+        elif msg.type == 'note_off':
+            pad_index = self._input_note_to_pad[msg.note]
+            if pad_index is not None:
+                self.pad_released.emit(pad_index)
+
+    def is_input_open(self) -> bool:
+        return self._input_listener.is_open()
+
+    def get_input_port_name(self) -> str | None:
+        return self._input_listener.port_name
+
+    def get_output_queue_depth(self) -> int:
+        return self._output_worker.queue_depth()
+
+    def wait_for_output(self, timeout: float | None = None) -> bool:
+        """Blocks until all queued output has been sent. Meant for scripts and tests, not the GUI."""
+        return self._output_worker.wait_until_idle(timeout)
+
+    def shutdown(self) -> None:
+        """Stops the output worker thread. Call once when the application exits."""
+        self.cancel_capture_replay()
+        self._input_listener.close()
+        self._output_worker.stop()
+        self.stop_capture()
+
+    # --- Output budget / throughput model ---
+    def set_output_rate_limit(self, messages_per_second: float, burst_messages: int | None = None) -> None:
+        """Sets the messages-per-second budget (0 disables throttling) and optionally the burst size."""
+        self._rate_limiter.messages_per_second = max(0.0, float(messages_per_second))
+        if burst_messages is not None:
+            self._rate_limiter.burst_messages = max(1, int(burst_messages))
+
+    def get_output_rate_limit(self) -> float:
+        return self._rate_limiter.messages_per_second
+
+    def get_measured_output_rate(self) -> float | None:
+        return self._rate_limiter.measured_messages_per_second()
+
+    def set_frame_period_ms(self, frame_period_ms: int) -> None:
+        """Tells the controller how often frames arrive (0 when not playing) so overruns can be reported."""
+        self._frame_period_ms = max(0, int(frame_period_ms))
+
+    def predict_frame_time_ms(self, message_count: int | None = None) -> float:
+        """
+        Predicted time to get a frame of message_count messages to the device, including the Off/On gap.
+        Defaults to the worst-case full refresh (64 Note Off + 64 Note On on the SmartPad).
+        """
+        if message_count is None:
+            message_count = self.profile.pad_count * 2
+        if self.direct_overwrite: # One message per pad and no Off/On gap
+            return self._rate_limiter.predict_send_time_s(min(message_count, self.profile.pad_count), 0.0) * 1000.0
+        return self._rate_limiter.predict_send_time_s(message_count, self.inter_command_delay * 2) * 1000.0
+
+    def min_frame_delay_ms(self, message_count: int | None = None) -> int:
+        """Shortest frame delay at which a frame of message_count messages still fits, per the model."""
+        return int(self.predict_frame_time_ms(message_count) + 0.999)
+
+    # --- Output metrics ---
+    def get_metrics_snapshot(self) -> dict:
+        """Counters, rates and the send-latency histogram for the output path (see core.output_metrics)."""
+        snapshot = self._metrics.snapshot()
+        snapshot["queue_depth"] = self._output_worker.queue_depth()
+        snapshot["port_name"] = self._port_name_used or ""
+        snapshot["reconnecting"] = self._reconnecting
+        snapshot["frame_cache"] = self._compiled_frame_cache.stats()
+        return snapshot
+
+    def reset_metrics(self) -> None:
+        self._metrics.reset()
+
+    # --- Traffic capture / replay ---
+    def start_capture(self, filepath: str) -> bool:
+        """
+        Starts recording every message written to the port, with microsecond timestamps,
+        into a Standard MIDI File. Replaces any capture already running.
+        """
+        self.stop_capture()
+        try:
+            self._capture_recorder = MidiCaptureRecorder(filepath)
+        except OSError as e:
+            self.error_occurred.emit(f"Could not start MIDI capture: {e}")
+            return False
+        print(f"MIDI capture started: {filepath}")
+        return True
+
+    def stop_capture(self) -> str | None:
+        """Stops recording and finalizes the file. Returns its path, or None if nothing was recording."""
+        recorder = self._capture_recorder
+        if recorder is None:
+            return None
+        self._capture_recorder = None
+        try:
+            recorder.close()
+        except OSError as e:
+            self.error_occurred.emit(f"Could not finalize MIDI capture: {e}")
+        print(f"MIDI capture stopped: {recorder.filepath} ({recorder.message_count} messages)")
+        return recorder.filepath
+
+    def is_capturing(self) -> bool:
+        return self._capture_recorder is not None
+
+    def send_raw_messages(self, messages: list[bytes]) -> None:
+        """
+        Queues arbitrary raw MIDI messages (e.g. a replayed capture) for the output worker.
+        The device state mirror can't follow these, so the next frame is a full refresh.
+        """
+        if not self.is_connected():
+            return
+        self._submit_output_job(functools.partial(self._write_raw_messages, list(messages)), priority=False)
+
+    def _write_raw_messages(self, messages: list[bytes]) -> None:
+        self.invalidate_device_state()
+        self._send_raw_midi_messages(messages)
+
+    def replay_capture(self, filepath: str, max_speed: bool = False) -> bool:
+        """Re-sends a capture to the connected port at its original timing or as fast as possible."""
+        if not self.is_connected():
+            self.error_occurred.emit("Not connected. Cannot replay capture.")
+            return False
+        self.cancel_capture_replay()
+        self._capture_replayer = MidiCaptureReplayer(
+            filepath, self.send_raw_messages, max_speed=max_speed,
+            wait_for_output=self.wait_for_output,
+            on_finished=self.capture_replay_finished.emit,
+        )
+        self._capture_replayer.start()
+        return True
+
+    def cancel_capture_replay(self) -> None:
+        replayer = self._capture_replayer
+        if replayer is not None and replayer.is_alive():
+            replayer.cancel()
+            if threading.current_thread() is not replayer:
+                replayer.join(1.0)
+        self._capture_replayer = None
+
+    def get_send_error_count(self) -> int:
+        return self._send_error_count
+
+    def get_output_settings(self) -> dict:
+        """Current output tuning, in the form apply_output_settings() and calibration use."""
+        return {
+            "inter_command_delay": self.inter_command_delay,
+            "burst_messages": self._rate_limiter.burst_messages,
+            "messages_per_second": self._rate_limiter.messages_per_second,
+            "measured_messages_per_second": self._rate_limiter.calibrated_messages_per_second or 0.0,
+            "delta_mode": self.delta_mode,
+            "direct_overwrite": self.direct_overwrite,
+        }
+
+    def apply_output_settings(self, output_settings: dict) -> None:
+        if "inter_command_delay" in output_settings:
+            self.inter_command_delay = max(0.0, float(output_settings["inter_command_delay"]))
+        if "messages_per_second" in output_settings or "burst_messages" in output_settings:
+            self.set_output_rate_limit(output_settings.get("messages_per_second", self._rate_limiter.messages_per_second),
+                                       output_settings.get("burst_messages"))
+        if "measured_messages_per_second" in output_settings: # Throughput model only; never the rate budget
+            self._rate_limiter.calibrated_messages_per_second = float(output_settings["measured_messages_per_second"]) or None
+        if "delta_mode" in output_settings:
+            self.delta_mode = bool(output_settings["delta_mode"])
+        if "direct_overwrite" in output_settings:
+            self.direct_overwrite = bool(output_settings["direct_overwrite"])
+
+    def _apply_saved_calibration(self, port_name: str) -> None:
+        """Puts the output tuning back to defaults, then applies what was saved for this port (if anything)."""
+        # Nothing measured or verified on the previous port may carry over to this one
+        self.inter_command_delay = DEFAULT_INTER_COMMAND_DELAY
+        self.set_output_rate_limit(DEFAULT_MESSAGES_PER_SECOND, DEFAULT_BURST_MESSAGES)
+        self._rate_limiter.calibrated_messages_per_second = None
+        self.direct_overwrite = self.profile.direct_overwrite
+        calibration = load_port_calibration(port_name)
+        if calibration:
+            self.apply_output_settings(calibration)
+            print(f"Applied saved calibration for '{port_name}': "
+                  f"delay {self.inter_command_delay * 1000:.2f} ms, batch {self._rate_limiter.burst_messages}, "
+                  f"direct overwrite {'on' if self.direct_overwrite else 'off'}")
+
+    def set_direct_overwrite(self, enabled: bool, save_for_port: bool = True) -> bool:
+        """
+        Switches direct-overwrite output on or off for the connected port, remembering the choice
+        for it. The flag belongs to a port (connect() resets it), so this fails while disconnected.
+        """
+        if not self.is_connected():
+            self.error_occurred.emit("Connect to a port before changing direct overwrite.")
+            return False
+        self.direct_overwrite = bool(enabled)
+        if save_for_port and self._port_name_used:
+            calibration = load_port_calibration(self._port_name_used) or self.get_output_settings()
+            calibration["direct_overwrite"] = self.direct_overwrite
+            save_port_calibration(self._port_name_used, calibration)
+        return True
+
+    # --- Calibration ---
+    def calibrate(self, verify_frame=None) -> bool:
+        """
+        Starts sweeping inter_command_delay and burst size against the connected port using
+        known test patterns (see core.output_calibration). Runs in the background; progress and
+        the result arrive via calibration_progress / calibration_finished. The fastest passing
+        setting is applied and saved for this port name. verify_frame(expected_colors) -> bool
+        checks what the device actually shows; on an emulated port the emulator's own state
+        is used automatically. Without a verifier there is no calibration: a setting that
+        merely delivers without send errors may still lose messages on the device.
+        Returns False if not connected, no verifier is available or a calibration is already running.
+        """
+        if not self.is_connected():
+            self.error_occurred.emit("Not connected. Cannot calibrate.")
+            return False
+        if self.is_calibrating():
+            return False
+        verify_frame = verify_frame or self._port_verifier()
+        if verify_frame is None:
+            self.error_occurred.emit("This port cannot report pad colors, so output speed cannot be calibrated on it.")
+            return False
+        self._calibration_run = OutputCalibrationRun(
+            self, verify_frame=verify_frame,
+            on_progress=self.calibration_progress.emit,
+            on_finished=self._on_calibration_run_finished,
+        )
+        self._calibration_run.start()
+        return True
+
+    def verify_direct_overwrite(self, verify_frame=None) -> bool:
+        """
+        Runs the calibration test patterns in Off+On mode and in direct-overwrite mode against
+        the connected port and checks each frame with verify_frame(expected_colors) -> bool
+        (the emulator's state on an emulated port). If direct overwrite shows the same frames,
+        it is enabled and saved for this port. The result arrives via direct_overwrite_verified.
+        A physical SmartPad cannot report its pads, so there a verifier must be supplied;
+        otherwise use set_direct_overwrite() after checking the pads by eye.
+        Returns False if it could not start.
+        """
+        if not self.is_connected():
+            self.error_occurred.emit("Not connected. Cannot verify direct overwrite.")
+            return False
+        if self.is_calibrating():
+            return False
+        verify_frame = verify_frame or self._port_verifier()
+        if verify_frame is None:
+            self.error_occurred.emit("This port cannot report pad colors; check direct overwrite by eye instead.")
+            return False
+        self._calibration_run = DirectOverwriteVerification(
+            self, verify_frame,
+            on_progress=self.calibration_progress.emit,
+            on_finished=self._on_direct_overwrite_verification_finished,
+        )
+        self._calibration_run.start()
+        return True
+
+    def _on_direct_overwrite_verification_finished(self, results: dict | None) -> None:
+        """Called on the verification thread once both modes ran and the previous settings are restored."""
+        if results is None:
+            self.direct_overwrite_verified.emit(False, {})
+            return
+        supported = results["paired_passed"] and results["direct_passed"]
+        self.set_direct_overwrite(supported)
+        self.invalidate_device_state()
+        self.direct_overwrite_verified.emit(supported, results)
+
+    def can_report_pads(self) -> bool:
+        """True if the connected port can tell what its pads show (needed by calibrate() and verify_direct_overwrite())."""
+        return self._port_verifier() is not None
+
+    def _port_verifier(self):
+        # Physical SmartPads cannot report their LEDs; the emulator can
+        port = self._midi_port
+        return port.matches if isinstance(port, EmulatedSmartPadPort) else None
+
+    def is_calibrating(self) -> bool:
+        return self._calibration_run is not None and self._calibration_run.is_alive()
+
+    def cancel_calibration(self) -> None:
+        if self.is_calibrating():
+            self._calibration_run.cancel()
+            self._calibration_run.join(CALIBRATION_CANCEL_TIMEOUT_S)
+
+    def _on_calibration_run_finished(self, best: dict | None) -> None:
+        """Called on the calibration thread once the sweep ends and the previous settings are restored."""
+        port_name = self._port_name_used
+        if best is None or not port_name:
+            self.calibration_finished.emit(False, {})
+            return
+        calibration = {
+            "inter_command_delay": best["inter_command_delay"],
+            "burst_messages": best["burst_messages"],
+            "messages_per_second": best["messages_per_second"], # The budget the burst size was measured under
+            "measured_messages_per_second": best["measured_messages_per_second"],
+            "frame_time_ms": best["frame_time_ms"],
+            "direct_overwrite": self.direct_overwrite, # Verified separately; keep it
+        }
+        self.apply_output_settings(calibration)
+        save_port_calibration(port_name, calibration)
+        self.invalidate_device_state()
+        self.calibration_finished.emit(True, calibration)
+
+    def _check_frame_budget(self, message_count: int) -> None:
+        """Runs on the output worker: reports frames that cannot be delivered within the frame period."""
+        if self._frame_period_ms <= 0 or message_count <= 0:
+            return
+        predicted_ms = self.predict_frame_time_ms(message_count)
+        if predicted_ms > self._frame_period_ms:
+            self.output_overrun.emit(predicted_ms, self._frame_period_ms)
+
+    def invalidate_device_state(self) -> None:
+        """Forgets what the device is showing, so the next frame is sent in full."""
+        self._device_state = [None] * self.profile.pad_count
+
+    def is_device_state_known(self) -> bool:
+        return all(color is not None for color in self._device_state)
+
+    def _normalize_color_name(self, color_name: str) -> str:
+        """Upper-cases a color name; unknown colors end up dark on the device, so mirror them as OFF."""
+        color_name_upper = color_name.upper()
+        return color_name_upper if color_name_upper in self.profile.color_to_velocity else "OFF"
+
+    def _resolve_raw_sender(self, port) -> Callable[[bytes], None]:
+        """
+        Returns a function that writes one precomputed byte triple to the port.
+        The rtmidi backend and the emulator accept raw bytes directly; any other mido port gets the
+        matching prebuilt Message from the profile's message_for_bytes, so nothing is constructed per send.
+        """
+        send_raw = getattr(port, "send_raw", None) # EmulatedSmartPadPort
+        if send_raw is not None:
+            return send_raw
+        rt_port = getattr(port, "_rt", None)
+        if rt_port is not None and hasattr(rt_port, "send_message"):
+            return rt_port.send_message
+        message_for_bytes = self.profile.message_for_bytes
+        return lambda data: port.send(message_for_bytes[data])
+
+    def _send_raw_midi_message(self, data: bytes):
+        """Internal helper to send one raw MIDI message with error handling. Runs on the output worker thread."""
+        self._send_raw_midi_messages((data,))
+
+    def _send_raw_midi_messages(self, messages, should_yield: Callable[[], bool] | None = None) -> int:
+        """
+        Sends a batch of raw MIDI messages, throttled by the rate limiter in chunks of at most
+        one burst, each under a single port lock. Runs on the output worker thread.
+        If should_yield is given it is polled before each message, and sending stops as soon
+        as it returns True. Returns how many messages were consumed (sent or failed).
+        """
+        messages = list(messages)
+        burst = self._rate_limiter.burst_messages
+        consumed = 0
+        for start in range(0, len(messages), burst):
+            chunk = messages[start:start + burst]
+            wait_s = self._rate_limiter.reserve(len(chunk))
+            if wait_s > 0:
+                time.sleep(wait_s)
+            send_start = time.perf_counter()
+            chunk_consumed = self._send_raw_chunk(chunk, should_yield)
+            self._rate_limiter.record_send_time(chunk_consumed, time.perf_counter() - send_start)
+            consumed += chunk_consumed
+            if chunk_consumed < len(chunk):
+                self._rate_limiter.refund(len(chunk) - chunk_consumed) # The rest is resent (and reserved) later
+                break
+        return consumed
+
+    def _send_raw_chunk(self, messages: list[bytes], should_yield: Callable[[], bool] | None = None) -> int:
+        with self._port_lock:
+            if not self._is_port_open():
+                # print(f"MIDI port not open (or being reopened). Cannot send: {messages}")
+                return len(messages)
+            raw_send = self._raw_send
+            recorder = self._capture_recorder
+            perf_counter = time.perf_counter
+            latencies_us = []
+            sent_bytes = 0
+            consumed = 0
+            for data in messages:
+                if should_yield is not None and should_yield():
+                    break
+                consumed += 1
+                try:
+                    started = perf_counter()
+                    raw_send(data)
+                    finished = perf_counter()
+                    latencies_us.append((finished - started) * 1_000_000)
+                    sent_bytes += len(data)
+                    if recorder is not None:
+                        recorder.record(finished, data)
+                    self._send_failing = False
+                    # print(f"Sent: {data.hex()}") # Optional: for heavy debugging
+                except Exception as e:
+                    self._metrics.record_send_error()
+                    print(f"Error sending MIDI message {data.hex()}: {e}")
+                    # We can no longer trust the mirror; the next frame goes out in full.
+                    self._send_error_count += 1
+                    self.invalidate_device_state()
+                    if not self._send_failing: # Report once per failure streak, not once per message
+                        self._send_failing = True
+                        self.error_occurred.emit(f"MIDI send error: {e}")
+                    # The rest of this chunk would fail too; reopen the port and resync instead
+                    self._on_port_failed(e)
+                    consumed = len(messages)
+                    break
+            if latencies_us:
+                self._metrics.record_send(len(latencies_us), sent_bytes, latencies_us)
+            return consumed
+
+    def _send_after_gap(self, pad_messages: list[tuple[int, bytes]], gap_s: float, preemptible: bool = False) -> set:
+        """
+        Sends (pad, message) pairs once gap_s has passed, without blocking the worker.
+        Runs on the output worker thread, right after the matching Note Offs went out.
+        Bulk callers pass preemptible=True; returns the pads a priority job took over meanwhile.
+        """
+        if not pad_messages:
+            return set()
+        if gap_s > 0:
+            self._output_worker.send_after(gap_s, pad_messages)
+            return set()
+        if preemptible:
+            return self._output_worker.send_preemptible(pad_messages)
+        self._send_raw_midi_messages([message for _, message in pad_messages])
+        return set()
 
     def set_pad_color_by_name(self, pad_index_0_63: int, color_name: str, silent: bool = False) -> None:
         """
         Sets the color of a specific pad using its 0-63 index and color name.
-        Manages the Note Off -> (optional delay) -> Note On sequence.
+        The Note Off -> (optional delay) -> Note On sequence is sent by the output worker.
+        Writes that pile up before the worker gets to them are merged per pad, so only
+        the final color of each pad is sent.
         """
         if not self.is_connected():
             if not silent:
                 self.error_occurred.emit("Not connected. Cannot set pad color.")
             return
 
-        if not (0 <= pad_index_0_63 < 64):
+        if not (0 <= pad_index_0_63 < self.profile.pad_count):
             if not silent:
                 print(f"Warning: Invalid pad_index_0_63: {pad_index_0_63}")
             return
 
-        row = pad_index_0_63 // 8
-        col = pad_index_0_63 % 8
-        
-        try:
-            pad_note_number = PAD_GRID_NOTES[row][col]
-        except IndexError:
+        self._submit_pad_writes({pad_index_0_63: color_name}, silent)
+
+    def set_pads(self, pad_colors: dict[int, str], silent: bool = True) -> None:
+        """
+        Sets a sparse set of pads, {pad_index_0_63: color_name, ...}, as one batched operation:
+        one burst of Note Offs, then one paced burst of Note Ons (or one message per pad in
+        direct-overwrite mode). Only the given pads cost messages, so effects, fill tools and
+        external inputs can push small changes cheaply. Like single-pad edits, the batch goes
+        out ahead of queued frames and merges with pad writes still waiting to be sent.
+        """
+        if not self.is_connected():
             if not silent:
-                print(f"Warning: Could not find note for pad_index {pad_index_0_63} (row:{row}, col:{col})")
+                self.error_occurred.emit("Not connected. Cannot set pads.")
+            return
+
+        valid = {i: color for i, color in pad_colors.items() if isinstance(i, int) and 0 <= i < self.profile.pad_count}
+        if len(valid) != len(pad_colors) and not silent:
+            print(f"Warning: Ignoring invalid pad indices: {sorted(set(pad_colors) - set(valid), key=str)}")
+        if valid:
+            self._submit_pad_writes(valid, silent)
+
+    def _submit_pad_writes(self, pad_colors: dict[int, str], silent: bool) -> None:
+        if not silent:
+            for color_name in pad_colors.values():
+                if color_name.upper() not in self.profile.color_to_velocity:
+                    print(f"Warning: Color '{color_name}' not found in the {self.profile.name} palette.")
+
+        # Interactive edits use the priority lane: they go out ahead of queued frames
+        with self._coalesce_lock:
+            serial = next(self._submit_serial)
+            job = self._tail_pad_job
+            merged = job is not None and not job.started
+            if not merged:
+                job = _CoalescedPadJob(self, silent)
+                self._tail_pad_job = job
+            for pad_index, color_name in pad_colors.items():
+                self._pad_edit_serial[pad_index] = serial
+                job.pad_colors[pad_index] = self._desired_state[pad_index] = self._normalize_color_name(color_name)
+            job.silent = job.silent and silent
+        if not merged:
+            self._output_worker.submit(job, priority=True)
+
+    def _write_coalesced_pads(self, job: _CoalescedPadJob) -> None:
+        """Output worker side of set_pad_color_by_name() / set_pads(): sends the job's merged pad writes as one batch."""
+        with self._coalesce_lock:
+            job.started = True
+            if self._tail_pad_job is job:
+                self._tail_pad_job = None
+            pad_colors = dict(job.pad_colors)
+        self._write_pads(pad_colors, job.silent)
+
+    def _write_pads(self, pad_colors: dict[int, str], silent: bool) -> None:
+        """Note Off for every given pad, then (after inter_command_delay) Note On for those not OFF."""
+        errors_before = self._send_error_count
+        pads = list(pad_colors)
+        profile = self.profile
+
+        if self.direct_overwrite: # One message per pad, no gap
+            self._output_worker.cancel_follow_ups(pads)
+            self._send_raw_midi_messages([profile.direct_pad_bytes[i][color] for i, color in pad_colors.items()])
+            if not silent:
+                print(f"Sent direct overwrite to pad(s) {pad_colors}")
+            if self._send_error_count == errors_before:
+                for i, color in pad_colors.items():
+                    self._device_state[i] = color
             return
 
-        color_name_upper = color_name.upper()
-        
         # 1. Always send Note Off first
-        off_msg = mido.Message('note_off', channel=TARGET_MIDI_CHANNEL, note=pad_note_number, velocity=0)
-        self._send_raw_midi_message(off_msg)
+        self._output_worker.cancel_follow_ups(pads)
+        self._send_raw_midi_messages([profile.note_off_bytes[i] for i in pads])
+        if not silent:
+            print(f"Sent Note Off to pad(s) {pads}")
+
+        # 2. Pads that are not "OFF" get their Note On after a very short delay. The pacer
+        # sends it at its deadline while the worker moves on. For "OFF", the Note Off was sufficient.
+        on_messages = [(i, profile.note_on_bytes[i][color]) for i, color in pad_colors.items() if color != "OFF"]
+        self._send_after_gap(on_messages, self.inter_command_delay)
         if not silent:
-            print(f"Sent Note Off to pad {pad_index_0_63} (Note {pad_note_number})")
-
-        # 2. If the command is not "OFF", send Note On after a very short delay
-        if color_name_upper != "OFF":
-            if color_name_upper in COLOR_TO_VELOCITY:
-                velocity = COLOR_TO_VELOCITY[color_name_upper]
-                
-                # Apply delay only if we are going to send an ON message
-                if self.inter_command_delay > 0:
-                    time.sleep(self.inter_command_delay)
-
-                on_msg = mido.Message('note_on', channel=TARGET_MIDI_CHANNEL, note=pad_note_number, velocity=velocity)
-                self._send_raw_midi_message(on_msg)
-                if not silent:
-                    print(f"Sent Note On to pad {pad_index_0_63} (Note {pad_note_number}), Vel {velocity} for {color_name_upper}")
+            for i, color in pad_colors.items():
+                if color != "OFF":
+                    print(f"Sent Note On to pad {i} (Note {profile.pad_index_to_note[i]}), Vel {profile.color_to_velocity[color]} for {color}")
+
+        if self._send_error_count == errors_before:
+            for i, color in pad_colors.items():
+                self._device_state[i] = color
+
+    def _submit_output_job(self, job: Callable[[], None], priority: bool) -> None:
+        """Queues a job that is not coalesced. Later writes in the same lane must queue behind it, so coalescing stops here."""
+        with self._coalesce_lock:
+            if priority:
+                self._tail_pad_job = None
             else:
-                if not silent:
-                    print(f"Warning: Color '{color_name}' not found in COLOR_TO_VELOCITY map.")
-        # If color_name_upper IS "OFF", we've already sent the Note Off, and that's sufficient.
+                self._tail_frame_job = None
+        self._output_worker.submit(job, priority=priority)
+
+    def _on_output_job_dropped(self, job: Callable[[], None]) -> None:
+        with self._coalesce_lock:
+            if job is self._tail_frame_job:
+                self._tail_frame_job = None
+            elif job is self._tail_pad_job:
+                self._tail_pad_job = None
+        if isinstance(job, _CoalescedFrameJob):
+            self._metrics.record_frames_skipped()
 
-    def set_all_pads_from_color_names(self, color_names_list: list[str], silent: bool = False) -> None:
+    def set_all_pads_from_color_names(self, color_names_list: list[str], silent: bool = False,
+                                      deadline: float | None = None) -> None:
         """
-        Sets all 64 pads based on a list of color names.
-        Sends commands sequentially for each pad.
+        Sets all pads (64 on the SmartPad) based on a list of color names, one per pad.
+        The frame is compiled into one batch and sent by the output worker (see _send_compiled_frame).
+        In delta mode only the pads that changed since the last frame are sent,
+        unless the device state is unknown, in which case every pad is refreshed.
+        If an earlier frame is still waiting to be sent, this one replaces it.
+        deadline is the perf_counter() time by which sending must start, or the frame is
+        dropped as late; during playback it defaults to one frame period from now.
         """
         if not self.is_connected():
             if not silent:
                 self.error_occurred.emit("Not connected. Cannot set all pads.")
             return
 
-        if len(color_names_list) != 64:
+        if len(color_names_list) != self.profile.pad_count:
             if not silent:
-                print(f"Warning: color_names_list must have 64 elements, got {len(color_names_list)}")
+                print(f"Warning: color_names_list must have {self.profile.pad_count} elements, got {len(color_names_list)}")
             return
 
-        # Option 1: Send all Note Offs, tiny pause, then all Note Ons
-        # This might provide a smoother visual update if supported well by the device.
-        
-        # First, send all Note Off messages
-        for i in range(64):
-            row, col = i // 8, i % 8
-            try:
-                pad_note_number = PAD_GRID_NOTES[row][col]
-                off_msg = mido.Message('note_off', channel=TARGET_MIDI_CHANNEL, note=pad_note_number, velocity=0)
-                self._send_raw_midi_message(off_msg)
-            except IndexError:
-                if not silent: print(f"Skipping Note Off for invalid pad index {i} in set_all_pads")
-                continue
-        
-        # if not silent: print("Sent all Note Offs for set_all_pads_from_color_names.")
-
-        # Short delay after all Note Offs before sending Note Ons
-        if self.inter_command_delay > 0:
-            time.sleep(self.inter_command_delay * 2) # Currently 2ms if inter_command_delay is 1ms
+        target_state = self._normalize_frame(color_names_list)
+        if deadline is None and self._frame_period_ms > 0:
+            deadline = time.perf_counter() + self._frame_period_ms / 1000.0
+        with self._coalesce_lock:
+            self._desired_state = list(target_state)
+            frame = (target_state, silent, deadline, next(self._submit_serial))
+            job = self._tail_frame_job
+            superseded = job is not None and not job.started
+            if superseded:
+                job.frame = frame
+            else:
+                job = _CoalescedFrameJob(self, frame)
+                self._tail_frame_job = job
+        if superseded:
+            self._metrics.record_frames_skipped()
+        else:
+            self._output_worker.submit(job)
 
+    def prepare_frame(self, color_names_list: list[str]) -> None:
+        """Normalizes a full frame ahead of time (e.g. by a lookahead scheduler), so sending it later is a cache hit."""
+        if len(color_names_list) == self.profile.pad_count:
+            self._normalize_frame(color_names_list)
 
-        # Then, send all Note On messages for non-"OFF" colors
-        for i in range(64):
-            color_name = color_names_list[i]
-            color_name_upper = color_name.upper()
+    def _normalize_frame(self, color_names_list: list[str]) -> tuple[str, ...]:
+        frame_key = tuple(color_names_list)
+        target_state = self._normalized_frame_cache.get(frame_key)
+        if target_state is None:
+            target_state = tuple(self._normalize_color_name(name) for name in frame_key)
+            self._normalized_frame_cache.put(frame_key, target_state)
+        return target_state
 
-            if color_name_upper != "OFF" and color_name_upper in COLOR_TO_VELOCITY:
-                row, col = i // 8, i % 8
-                try:
-                    pad_note_number = PAD_GRID_NOTES[row][col]
-                    velocity = COLOR_TO_VELOCITY[color_name_upper]
-                    on_msg = mido.Message('note_on', channel=TARGET_MIDI_CHANNEL, note=pad_note_number, velocity=velocity)
-                    self._send_raw_midi_message(on_msg)
-                except IndexError:
-                    if not silent: print(f"Skipping Note On for invalid pad index {i} in set_all_pads")
-                    continue
-            # If color is "OFF", no Note On is needed as Note Off was already sent.
+    def _write_coalesced_frame(self, job: _CoalescedFrameJob) -> None:
+        """Output worker side of set_all_pads_from_color_names(): sends the job's newest frame unless it is late."""
+        with self._coalesce_lock:
+            job.started = True
+            if self._tail_frame_job is job:
+                self._tail_frame_job = None
+            target_state, silent, deadline, serial = job.frame
+            cleared_since = self._clear_serial > serial
+            # Pads edited after this frame was submitted keep the edit (it already overtook us)
+            edited_since = {i for i, edit_serial in enumerate(self._pad_edit_serial) if edit_serial > serial}
+        if cleared_since:
+            self._metrics.record_frames_skipped()
+            return
+        if deadline is not None and time.perf_counter() > deadline and not self._last_frame_dropped_late:
+            self._last_frame_dropped_late = True
+            self._metrics.record_frames_skipped(late=True)
+            if not silent:
+                print("Warning: Dropped a frame that missed its output deadline.")
+            return
+        self._last_frame_dropped_late = False
+        self._write_all_pads(target_state, silent, edited_since)
 
-       #  if not silent: print("Finished sending Note Ons for set_all_pads_from_color_names.")
+    def _write_all_pads(self, target_state: tuple[str, ...], silent: bool, skip_pads: set = frozenset()) -> None:
+        """
+        Sends one frame; the delta against the device mirror is computed here, at send time.
+        In delta mode only the pads whose color changed are sent. The compiled buffer for
+        a (device state, frame) pair is cached, so a repeating loop costs one cache lookup.
+        Bulk traffic: priority jobs may run between its messages, and pads they rewrite
+        (like skip_pads) are left out of the rest of the frame.
+        """
+        self._metrics.record_frame_delivered()
+        base_state = tuple(self._device_state) if self.delta_mode and self.is_device_state_known() else None
+        cache_key = None if skip_pads else (base_state, target_state, self.direct_overwrite)
+        compiled = self._compiled_frame_cache.get(cache_key) if cache_key is not None else None
+        if compiled is None:
+            pad_count = self.profile.pad_count
+            pads = range(pad_count) if base_state is None else (i for i in range(pad_count) if base_state[i] != target_state[i])
+            compiled = compile_frame([i for i in pads if i not in skip_pads], target_state, self.direct_overwrite, self.profile)
+            if cache_key is not None:
+                self._compiled_frame_cache.put(cache_key, compiled)
+        if base_state is not None and self.delta_resync_rows > 0:
+            compiled = self._add_resync_slice(compiled, target_state, skip_pads)
+        if compiled.pads:
+            self._send_compiled_frame(compiled, target_state)
 
+    def _add_resync_slice(self, compiled: CompiledFrame, target_state: tuple[str, ...], skip_pads: set) -> CompiledFrame:
+        """Appends the next rotating rows to a delta frame (pads it does not already write); the cached delta is left as is."""
+        cols, rows = self.profile.grid_cols, self.profile.grid_rows
+        slice_rows = min(self.delta_resync_rows, rows)
+        first_row = self._resync_row
+        self._resync_row = (first_row + slice_rows) % rows
+        written = set(compiled.pads)
+        slice_pads = [(row % rows) * cols + col for row in range(first_row, first_row + slice_rows) for col in range(cols)]
+        resync_pads = [pad for pad in slice_pads if pad not in written and pad not in skip_pads]
+        if not resync_pads:
+            return compiled
+        self._metrics.record_resync(len(resync_pads))
+        resync = compile_frame(resync_pads, target_state, self.direct_overwrite, self.profile)
+        return CompiledFrame(compiled.pads + resync.pads, compiled.first_burst + resync.first_burst,
+                             compiled.follow_ups + resync.follow_ups, compiled.message_count + resync.message_count)
 
-        # --- Original sequential method (kept for reference/fallback if batching causes issues) ---
-        # for i, color_name in enumerate(color_names_list):
-        #     self.set_pad_color_by_name(i, color_name, silent=True) # Call individual method
-        # if not silent:
-        #     print("Finished set_all_pads_from_color_names.")
+    def _send_compiled_frame(self, compiled: CompiledFrame, target_state: tuple[str, ...]) -> None:
+        """
+        Sends the first burst (Note Offs in pad order, which is also ascending note order),
+        then the Note Ons after a short gap (2 ms if inter_command_delay is 1 ms).
+        """
+        errors_before = self._send_error_count
+        self._output_worker.cancel_follow_ups(compiled.pads)
+        self._check_frame_budget(compiled.message_count)
+        overridden = self._output_worker.send_preemptible(compiled.first_burst)
+        if compiled.follow_ups:
+            follow_ups = [m for m in compiled.follow_ups if m[0] not in overridden] if overridden else compiled.follow_ups
+            overridden |= self._send_after_gap(follow_ups, self.inter_command_delay * 2, preemptible=True)
 
+        # Update the mirror only for pads this frame still owns; a send error above has
+        # invalidated it, in which case the next frame falls back to a full refresh.
+        if self._send_error_count == errors_before:
+            device_state = self._device_state
+            for i in compiled.pads:
+                if i not in overridden:
+                    device_state[i] = target_state[i]
 
     def clear_all_pads_on_device(self, silent: bool = False) -> None:
         """Turns off all pads on the SmartPad device."""
@@ -286,27 +1226,30 @@ class SmartPadController(QObject):
             self.error_occurred.emit("Not connected. Cannot clear pads.")
             return
             
+        with self._coalesce_lock:
+            self._clear_serial = next(self._submit_serial) # Frames queued before this are obsolete
+            self._desired_state = ["OFF"] * self.profile.pad_count
+        self._submit_output_job(functools.partial(self._write_clear_all, silent), priority=True)
+
+    def _write_clear_all(self, silent: bool) -> None:
+        """Output worker side of clear_all_pads_on_device()."""
         if not silent:
             print("Clearing all pads on SmartPad device...")
 
-        # Efficiently send Note Off to all relevant notes
-        all_notes_to_turn_off = set()
-        for r in range(8):
-            for c in range(8):
-                try:
-                    all_notes_to_turn_off.add(PAD_GRID_NOTES[r][c])
-                except IndexError:
-                    pass # Should not happen with 8x8 grid
-
-        for note in sorted(list(all_notes_to_turn_off)): # Sending in order might be slightly cleaner
-            off_msg = mido.Message('note_off', channel=TARGET_MIDI_CHANNEL, note=note, velocity=0)
-            self._send_raw_midi_message(off_msg)
+        # note_off_bytes is in pad order (for the SmartPad that is also ascending note order)
+        errors_before = self._send_error_count
+        pad_count = self.profile.pad_count
+        self._output_worker.cancel_follow_ups(range(pad_count))
+        self._send_raw_midi_messages(self.profile.note_off_bytes)
+        if self._is_port_open() and self._send_error_count == errors_before:
+            self._device_state = ["OFF"] * pad_count
         
         if not silent:
             print("All pads cleared on device.")
+        self.pads_cleared.emit()
 
 if __name__ == '__main__':
-    # Example Usage (requires a connected SmartPad or virtual MIDI port)
+    # Example Usage (requires a connected SmartPad, a virtual MIDI port, or SMARTPAD_EMULATOR=1)
     print("SmartPadController Test Script")
     controller = SmartPadController()
 
@@ -363,4 +1306,5 @@ if __name__ == '__main__':
     else:
         print("\n--- Auto-connection failed. Please test manually if ports are available. ---")
 
+    controller.shutdown()
     print("\nTest finished.")
\ No newline at end of file
@@ -0,0 +1,121 @@
+# MidiPlusSmartPadRGBEditor/core/smartpad_controller_group.py
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.smartpad_controller import SmartPadController, OUTPUT_DRAIN_TIMEOUT_S
+
+
+class SmartPadControllerGroup(QObject):
+    """
+    Drives several SmartPads at once. Each port gets its own SmartPadController, and
+    with it its own output worker thread, so a frame pushed to N devices is queued to
+    all of them immediately and sent in parallel: total frame time stays close to the
+    single-device time instead of growing N-fold.
+    """
+    device_connection_changed = pyqtSignal(str, bool, str) # port_name, is_connected, message
+    error_occurred = pyqtSignal(str, str) # port_name, message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._controllers: dict[str, SmartPadController] = {} # port name -> controller, in connect order
+
+    def connect_ports(self, port_names: list[str]) -> list[str]:
+        """Opens every given output port (skipping ones already open). Returns the names that connected."""
+        connected = []
+        for port_name in port_names:
+            if port_name in self._controllers and self._controllers[port_name].is_connected():
+                connected.append(port_name)
+                continue
+            controller = self._controllers.get(port_name) or self._create_controller(port_name)
+            if controller.connect(port_name):
+                connected.append(port_name)
+        return connected
+
+    def _create_controller(self, port_name: str) -> SmartPadController:
+        controller = SmartPadController(parent=self)
+        controller.connection_status_changed.connect(
+            lambda is_connected, message, name=port_name: self.device_connection_changed.emit(name, is_connected, message)
+        )
+        controller.error_occurred.connect(lambda message, name=port_name: self.error_occurred.emit(name, message))
+        self._controllers[port_name] = controller
+        return controller
+
+    def disconnect_all(self, turn_all_off: bool = True) -> None:
+        """
+        Closes all ports. The clear commands are queued to every device first and drained
+        together, so shutting down N devices takes about as long as shutting down one.
+        """
+        controllers = [c for c in self._controllers.values() if c.is_connected()]
+        if turn_all_off:
+            for controller in controllers:
+                controller.clear_all_pads_on_device(silent=True)
+            for controller in controllers:
+                controller.wait_for_output(OUTPUT_DRAIN_TIMEOUT_S)
+        for controller in controllers:
+            controller.disconnect(turn_all_off=False)
+
+    def shutdown(self) -> None:
+        """Disconnects everything and stops all output workers."""
+        self.disconnect_all()
+        for controller in self._controllers.values():
+            controller.shutdown()
+        self._controllers.clear()
+
+    def get_controller(self, port_name: str) -> SmartPadController | None:
+        return self._controllers.get(port_name)
+
+    def get_connected_port_names(self) -> list[str]:
+        return [name for name, controller in self._controllers.items() if controller.is_connected()]
+
+    def set_all_pads_from_color_names(self, color_names_list: list[str], silent: bool = True,
+                                      deadline: float | None = None) -> None:
+        """Pushes the same full frame (64 colors on the SmartPad) to every connected device."""
+        for controller in self._controllers.values():
+            if controller.is_connected():
+                controller.set_all_pads_from_color_names(color_names_list, silent=silent, deadline=deadline)
+
+    def set_frames(self, frames_by_port: dict[str, list[str]], silent: bool = True,
+                   deadline: float | None = None) -> None:
+        """Pushes a different full frame to each device, keyed by port name."""
+        for port_name, color_names_list in frames_by_port.items():
+            controller = self._controllers.get(port_name)
+            if controller and controller.is_connected():
+                controller.set_all_pads_from_color_names(color_names_list, silent=silent, deadline=deadline)
+
+    def set_pad_color_by_name(self, pad_index_0_63: int, color_name: str, silent: bool = True) -> None:
+        for controller in self._controllers.values():
+            if controller.is_connected():
+                controller.set_pad_color_by_name(pad_index_0_63, color_name, silent=silent)
+
+    def set_pads(self, pad_colors: dict[int, str], silent: bool = True) -> None:
+        """Pushes the same sparse pad update to every connected device."""
+        for controller in self._controllers.values():
+            if controller.is_connected():
+                controller.set_pads(pad_colors, silent=silent)
+
+    def set_pads_by_port(self, pads_by_port: dict[str, dict[int, str]], silent: bool = True) -> None:
+        """Pushes a different sparse pad update to each device, keyed by port name."""
+        for port_name, pad_colors in pads_by_port.items():
+            controller = self._controllers.get(port_name)
+            if controller and controller.is_connected():
+                controller.set_pads(pad_colors, silent=silent)
+
+    def clear_all_pads(self, silent: bool = True) -> None:
+        for controller in self._controllers.values():
+            if controller.is_connected():
+                controller.clear_all_pads_on_device(silent=silent)
+
+    def set_frame_period_ms(self, frame_period_ms: int) -> None:
+        for controller in self._controllers.values():
+            controller.set_frame_period_ms(frame_period_ms)
+
+    def min_frame_delay_ms(self) -> int:
+        """Shortest frame delay every connected device keeps up with. Devices send in parallel, so this is the slowest one's."""
+        return max((c.min_frame_delay_ms() for c in self._controllers.values() if c.is_connected()), default=0)
+
+    def wait_for_output(self, timeout: float | None = None) -> bool:
+        """Blocks until every device has drained its queue. Meant for scripts and tests, not the GUI."""
+        all_drained = True
+        for controller in self._controllers.values():
+            all_drained = controller.wait_for_output(timeout) and all_drained
+        return all_drained
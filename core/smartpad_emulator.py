@@ -0,0 +1,230 @@
+# MidiPlusSmartPadRGBEditor/core/smartpad_emulator.py
+
+import os
+import threading
+import time
+
+import mido
+
+from core.precise_timing import wait_until
+
+# Emulated ports show up in the port list under this prefix, e.g. "SmartPad Emulator 1".
+# The name contains "smartpad", so auto-connect treats them like the real device
+# (real ports are listed first, so hardware still wins when present).
+EMULATED_PORT_PREFIX = "SmartPad Emulator"
+# Number of emulated ports offered in the port list; set SMARTPAD_EMULATOR=N to enable
+EMULATED_PORT_COUNT_ENV = "SMARTPAD_EMULATOR"
+EMULATOR_LOG_LIMIT = 200000 # Messages kept in the timestamped log before the oldest are discarded
+
+_emulated_port_count = 0
+_emulated_ports: dict[str, "EmulatedSmartPadPort"] = {}
+_emulated_inputs: dict[str, "EmulatedSmartPadInput"] = {}
+_registry_lock = threading.Lock()
+
+
+class EmulatedSmartPadPort(mido.ports.BaseOutput):
+    """
+    In-process stand-in for a SmartPad output port. Note On/Off messages are decoded with
+    a device profile's note map and velocity palette (the default SmartPad profile unless
+    given) into a grid of colors, and every message is logged with a perf_counter timestamp,
+    so throughput, latency and correctness can be measured without MIDI hardware.
+
+    Optional hardware quirks can be simulated:
+      seconds_per_message - blocks each send this long (link/firmware speed)
+      sleep_while_sending - spend seconds_per_message in time.sleep() instead of a busy
+                            wait: coarser, but it releases the GIL like a real driver
+                            write, so several emulated units can send in parallel
+      min_off_on_gap_s    - a Note On arriving sooner than this after the same pad's
+                            Note Off is ignored, like a unit that needs inter_command_delay
+      supports_direct_overwrite - if False, a Note On for a pad that is already lit is
+                            ignored, like a unit that needs a Note Off before each new color
+    """
+
+    def __init__(self, name: str = f"{EMULATED_PORT_PREFIX} 1",
+                 seconds_per_message: float = 0.0,
+                 min_off_on_gap_s: float = 0.0,
+                 supports_direct_overwrite: bool = True,
+                 profile=None):
+        if profile is None:
+            # Imported here to avoid a circular import; the controller imports this module
+            from core.smartpad_controller import DEFAULT_DEVICE_PROFILE
+            profile = DEFAULT_DEVICE_PROFILE
+        self._channel = profile.channel
+        self._note_to_pad = profile.note_to_pad
+        self._velocity_to_color = profile.velocity_to_color
+        self._pad_count = profile.pad_count
+        self._grid_cols = profile.grid_cols
+        self.seconds_per_message = seconds_per_message
+        self.sleep_while_sending = False
+        self.min_off_on_gap_s = min_off_on_gap_s
+        self.supports_direct_overwrite = supports_direct_overwrite
+
+        self._state_lock = threading.Lock()
+        self._state: list[str] = ["OFF"] * self._pad_count
+        self._last_off_time: list[float] = [0.0] * self._pad_count
+        self._log: list[tuple[float, bytes]] = []
+        self.ignored_message_count = 0 # Messages that did not map to a pad/color or violated the gap
+        super().__init__(name=name)
+
+    # mido calls _send() with a Message; the controller uses send_raw() with byte triples
+    def _send(self, msg: mido.Message) -> None:
+        self.send_raw(bytes(msg.bytes()))
+
+    def send_raw(self, data: bytes) -> None:
+        if self.seconds_per_message > 0:
+            if self.sleep_while_sending:
+                time.sleep(self.seconds_per_message)
+            else:
+                wait_until(time.perf_counter() + self.seconds_per_message)
+        now = time.perf_counter()
+        with self._state_lock:
+            if len(self._log) >= EMULATOR_LOG_LIMIT:
+                del self._log[:EMULATOR_LOG_LIMIT // 10]
+            self._log.append((now, data))
+            self._apply_message_locked(now, data)
+
+    def _apply_message_locked(self, now: float, data: bytes) -> None:
+        if len(data) != 3 or (data[0] & 0x0F) != self._channel:
+            self.ignored_message_count += 1
+            return
+        status, note, velocity = data[0] & 0xF0, data[1], data[2]
+        pad_index = self._note_to_pad.get(note)
+        if pad_index is None or status not in (0x80, 0x90):
+            self.ignored_message_count += 1
+            return
+        if status == 0x80 or velocity == 0:
+            self._state[pad_index] = "OFF"
+            self._last_off_time[pad_index] = now
+            return
+        color = self._velocity_to_color.get(velocity)
+        if (color is None or (self.min_off_on_gap_s > 0 and now - self._last_off_time[pad_index] < self.min_off_on_gap_s)
+                or (not self.supports_direct_overwrite and self._state[pad_index] != "OFF")):
+            self.ignored_message_count += 1
+            return
+        self._state[pad_index] = color
+
+    # --- Inspection API ---
+    def get_state(self) -> list[str]:
+        """Current color name of each pad, in pad order (0-63 on the SmartPad)."""
+        with self._state_lock:
+            return list(self._state)
+
+    def get_grid(self) -> list[list[str]]:
+        state = self.get_state()
+        cols = self._grid_cols
+        return [state[r * cols:(r + 1) * cols] for r in range(self._pad_count // cols)]
+
+    def matches(self, color_names_list: list[str]) -> bool:
+        """True if the emulated pads show exactly this frame (usable as a calibration verifier)."""
+        expected = [name.upper() for name in color_names_list]
+        expected = [name if name in self._velocity_to_color.values() else "OFF" for name in expected]
+        return self.get_state() == expected
+
+    def get_message_log(self) -> list[tuple[float, bytes]]:
+        """(perf_counter timestamp, raw bytes) for every message received, oldest first."""
+        with self._state_lock:
+            return list(self._log)
+
+    def message_count(self) -> int:
+        with self._state_lock:
+            return len(self._log)
+
+    def clear_log(self) -> None:
+        with self._state_lock:
+            self._log.clear()
+            self.ignored_message_count = 0
+
+    def reset(self) -> None:
+        """Turns every emulated pad off and clears the log, like power-cycling the unit."""
+        with self._state_lock:
+            self._state = ["OFF"] * self._pad_count
+            self._last_off_time = [0.0] * self._pad_count
+            self._log.clear()
+            self.ignored_message_count = 0
+
+
+class EmulatedSmartPadInput:
+    """
+    Input side of an emulated SmartPad: press() and release() play the part of a finger on
+    a pad and deliver the Note On / Note Off to the callback, the way a mido input port with
+    a callback does (on the calling thread here, rather than the backend's).
+    """
+
+    def __init__(self, name: str, callback=None, profile=None):
+        if profile is None:
+            from core.smartpad_controller import DEFAULT_DEVICE_PROFILE
+            profile = DEFAULT_DEVICE_PROFILE
+        self.name = name
+        self.callback = callback
+        self.closed = False
+        self._channel = profile.channel
+        self._pad_to_note = profile.pad_index_to_note
+
+    def press(self, pad_index: int, velocity: int = 127) -> None:
+        self._deliver(mido.Message('note_on', channel=self._channel, note=self._pad_to_note[pad_index], velocity=velocity))
+
+    def release(self, pad_index: int) -> None:
+        self._deliver(mido.Message('note_off', channel=self._channel, note=self._pad_to_note[pad_index], velocity=0))
+
+    def _deliver(self, msg: mido.Message) -> None:
+        callback = self.callback
+        if not self.closed and callback is not None:
+            callback(msg)
+
+    def close(self) -> None:
+        self.closed = True
+        self.callback = None
+
+
+# --- Port registry: makes emulated ports selectable by name like real ones ---
+def set_emulated_port_count(count: int) -> None:
+    """Sets how many emulated ports get_emulated_port_names() offers (0 hides them)."""
+    global _emulated_port_count
+    _emulated_port_count = max(0, int(count))
+
+
+def get_emulated_port_names() -> list[str]:
+    return [f"{EMULATED_PORT_PREFIX} {i + 1}" for i in range(_emulated_port_count)]
+
+
+def is_emulated_port_name(port_name: str | None) -> bool:
+    return bool(port_name) and port_name.startswith(EMULATED_PORT_PREFIX)
+
+
+def open_emulated_port(port_name: str) -> EmulatedSmartPadPort:
+    """
+    Opens (or reopens) the emulated port with this name. The same instance is returned
+    for a name until it is closed, so a test can inspect what the controller sent.
+    """
+    with _registry_lock:
+        port = _emulated_ports.get(port_name)
+        if port is None or port.closed:
+            port = EmulatedSmartPadPort(port_name)
+            _emulated_ports[port_name] = port
+        return port
+
+
+def get_emulated_port(port_name: str) -> EmulatedSmartPadPort | None:
+    with _registry_lock:
+        return _emulated_ports.get(port_name)
+
+
+def open_emulated_input(port_name: str, callback) -> EmulatedSmartPadInput:
+    """Opens the input side of the emulated port with this name; see get_emulated_input()."""
+    with _registry_lock:
+        port = EmulatedSmartPadInput(port_name, callback)
+        _emulated_inputs[port_name] = port
+        return port
+
+
+def get_emulated_input(port_name: str) -> EmulatedSmartPadInput | None:
+    """The open input of an emulated port, for a test or benchmark to press pads on."""
+    with _registry_lock:
+        port = _emulated_inputs.get(port_name)
+        return port if port is not None and not port.closed else None
+
+
+try:
+    set_emulated_port_count(int(os.environ.get(EMULATED_PORT_COUNT_ENV, "0") or 0))
+except ValueError:
+    print(f"Warning: Ignoring invalid {EMULATED_PORT_COUNT_ENV} value; emulated ports disabled.")
@@ -0,0 +1,178 @@
+# MidiPlusSmartPadRGBEditor/core/tiled_canvas.py
+
+from typing import NamedTuple
+
+from core.smartpad_controller_group import SmartPadControllerGroup
+
+
+class CanvasTile(NamedTuple):
+    """One device's place on the canvas: its port and the canvas (row, col) of its top-left pad."""
+    port_name: str
+    row: int
+    col: int
+    rows: int = 8
+    cols: int = 8
+
+
+class TilingMap:
+    """
+    Partitions a rows x cols canvas into per-device tiles. Tiles must lie inside the canvas
+    and must not overlap; canvas cells no tile covers are simply not shown.
+    The pad <-> canvas index tables are built once here, so splitting a frame into tile
+    frames is a plain lookup per pad.
+    """
+
+    def __init__(self, canvas_rows: int, canvas_cols: int, tiles: list[CanvasTile]):
+        if canvas_rows <= 0 or canvas_cols <= 0:
+            raise ValueError("canvas size must be positive")
+        self.canvas_rows = canvas_rows
+        self.canvas_cols = canvas_cols
+        self.tiles = list(tiles)
+        # tile_to_canvas[port][pad] -> canvas index; canvas_to_tile[canvas index] -> (port, pad) or None
+        self.tile_to_canvas: dict[str, list[int]] = {}
+        self.canvas_to_tile: list[tuple[str, int] | None] = [None] * (canvas_rows * canvas_cols)
+        for tile in self.tiles:
+            if tile.port_name in self.tile_to_canvas:
+                raise ValueError(f"port {tile.port_name} is used by more than one tile")
+            if tile.row < 0 or tile.col < 0 or tile.row + tile.rows > canvas_rows or tile.col + tile.cols > canvas_cols:
+                raise ValueError(f"tile {tile.port_name} does not fit the {canvas_rows}x{canvas_cols} canvas")
+            indices = [(tile.row + r) * canvas_cols + tile.col + c for r in range(tile.rows) for c in range(tile.cols)]
+            for pad, canvas_index in enumerate(indices):
+                if self.canvas_to_tile[canvas_index] is not None:
+                    raise ValueError(f"tile {tile.port_name} overlaps tile {self.canvas_to_tile[canvas_index][0]}")
+                self.canvas_to_tile[canvas_index] = (tile.port_name, pad)
+            self.tile_to_canvas[tile.port_name] = indices
+
+    @classmethod
+    def grid(cls, port_names: list[str], tiles_across: int, tile_rows: int = 8, tile_cols: int = 8) -> 'TilingMap':
+        """Lays the ports out left to right, top to bottom, tiles_across per row (e.g. 4 ports, 2 across = 16x16)."""
+        tiles_down = (len(port_names) + tiles_across - 1) // tiles_across
+        tiles = [CanvasTile(name, (n // tiles_across) * tile_rows, (n % tiles_across) * tile_cols, tile_rows, tile_cols)
+                 for n, name in enumerate(port_names)]
+        return cls(tiles_down * tile_rows, tiles_across * tile_cols, tiles)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TilingMap':
+        """{"rows": 16, "cols": 16, "tiles": [{"port": ..., "row": 0, "col": 0, "rows": 8, "cols": 8}, ...]}"""
+        tiles = [CanvasTile(str(t["port"]), int(t["row"]), int(t["col"]), int(t.get("rows", 8)), int(t.get("cols", 8)))
+                 for t in data["tiles"]]
+        return cls(int(data["rows"]), int(data["cols"]), tiles)
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.canvas_rows,
+            "cols": self.canvas_cols,
+            "tiles": [{"port": t.port_name, "row": t.row, "col": t.col, "rows": t.rows, "cols": t.cols} for t in self.tiles],
+        }
+
+    def port_names(self) -> list[str]:
+        return [tile.port_name for tile in self.tiles]
+
+
+class TiledCanvas:
+    """
+    A virtual pad canvas larger than one device (e.g. 16x16 from four SmartPads in a 2x2 wall).
+    Frames and pixel edits are split per tile and handed to a SmartPadControllerGroup, where
+    every device has its own output worker: the tiles are sent concurrently, so the wall
+    updates in about the time of its slowest tile rather than the sum of all of them.
+    Tiles whose content did not change since the last frame are not sent at all.
+    """
+
+    def __init__(self, tiling: TilingMap, group: SmartPadControllerGroup | None = None):
+        self.tiling = tiling
+        self.group = group if group is not None else SmartPadControllerGroup()
+        self._canvas: list[str] = ["OFF"] * (tiling.canvas_rows * tiling.canvas_cols)
+        self._sent_tile_frames: dict[str, list[str]] = {} # port -> tile frame last handed to its controller
+
+    @property
+    def rows(self) -> int:
+        return self.tiling.canvas_rows
+
+    @property
+    def cols(self) -> int:
+        return self.tiling.canvas_cols
+
+    def connect(self) -> list[str]:
+        """Opens every tile's port. Returns the port names that connected."""
+        connected = self.group.connect_ports(self.tiling.port_names())
+        for tile in self.tiling.tiles:
+            controller = self.group.get_controller(tile.port_name)
+            if tile.port_name in connected and controller.profile.pad_count != tile.rows * tile.cols:
+                print(f"Warning: Tile {tile.port_name} is {tile.rows}x{tile.cols}, but its device profile "
+                      f"'{controller.profile.name}' has {controller.profile.pad_count} pads.")
+        self.invalidate()
+        return connected
+
+    def shutdown(self) -> None:
+        self.group.shutdown()
+
+    def invalidate(self) -> None:
+        """Forgets what each tile was sent, so the next frame goes to every tile (e.g. after a reconnect)."""
+        self._sent_tile_frames.clear()
+
+    def get_frame(self) -> list[str]:
+        return list(self._canvas)
+
+    def set_frame(self, color_names_list: list[str], silent: bool = True, deadline: float | None = None) -> None:
+        """
+        Shows a rows*cols frame (row-major) across the wall. All tiles get the same deadline,
+        so a late frame is dropped on every device alike instead of tearing the wall.
+        """
+        if len(color_names_list) != len(self._canvas):
+            if not silent:
+                print(f"Warning: Canvas frame must have {len(self._canvas)} elements, got {len(color_names_list)}")
+            return
+        self._canvas = list(color_names_list)
+        frames_by_port = {}
+        for port_name, indices in self.tiling.tile_to_canvas.items():
+            controller = self.group.get_controller(port_name)
+            if controller is None or not controller.is_connected():
+                self._sent_tile_frames.pop(port_name, None) # Send it in full once the device is back
+                continue
+            tile_frame = [color_names_list[i] for i in indices]
+            if self._sent_tile_frames.get(port_name) != tile_frame:
+                frames_by_port[port_name] = tile_frame
+                self._sent_tile_frames[port_name] = tile_frame
+        if frames_by_port:
+            self.group.set_frames(frames_by_port, silent=silent, deadline=deadline)
+
+    def set_pixels(self, pixels: dict[int, str], silent: bool = True) -> None:
+        """Sets a sparse set of canvas cells, {canvas_index: color_name}; each affected device gets one batch."""
+        pads_by_port: dict[str, dict[int, str]] = {}
+        canvas_to_tile = self.tiling.canvas_to_tile
+        for canvas_index, color_name in pixels.items():
+            if not 0 <= canvas_index < len(self._canvas):
+                if not silent:
+                    print(f"Warning: Invalid canvas index: {canvas_index}")
+                continue
+            self._canvas[canvas_index] = color_name
+            target = canvas_to_tile[canvas_index]
+            if target is None:
+                continue # Not covered by any tile
+            port_name, pad = target
+            pads_by_port.setdefault(port_name, {})[pad] = color_name
+            sent = self._sent_tile_frames.get(port_name)
+            if sent is not None:
+                sent[pad] = color_name
+        if pads_by_port:
+            self.group.set_pads_by_port(pads_by_port, silent=silent)
+
+    def set_pixel(self, row: int, col: int, color_name: str, silent: bool = True) -> None:
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self.set_pixels({row * self.cols + col: color_name}, silent=silent)
+
+    def clear(self, silent: bool = True) -> None:
+        self._canvas = ["OFF"] * len(self._canvas)
+        for tile in self.tiling.tiles:
+            self._sent_tile_frames[tile.port_name] = ["OFF"] * (tile.rows * tile.cols)
+        self.group.clear_all_pads(silent=silent)
+
+    def set_frame_period_ms(self, frame_period_ms: int) -> None:
+        self.group.set_frame_period_ms(frame_period_ms)
+
+    def min_frame_delay_ms(self) -> int:
+        """Shortest frame delay the whole wall can keep up with: that of its slowest device, as tiles send in parallel."""
+        return self.group.min_frame_delay_ms()
+
+    def wait_for_output(self, timeout: float | None = None) -> bool:
+        return self.group.wait_for_output(timeout)
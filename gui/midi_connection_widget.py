@@ -42,6 +42,9 @@ class MidiConnectionWidget(QGroupBox): # Inherit from QGroupBox for easy title
         # self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         # self.group_layout.addWidget(self.status_label)
 
+        self._is_connected = False
+        self._is_pending = False # A connect/disconnect is running in the background
+
         # Initial state
         self.update_ports_list([]) # Start with an empty list or "No ports"
         self.set_connection_status(False, "Disconnected")
@@ -59,7 +62,7 @@ class MidiConnectionWidget(QGroupBox): # Inherit from QGroupBox for easy title
             self.disconnect_requested.emit()
 
     def update_ports_list(self, ports: list[str]):
-        """Populates the MIDI port combobox."""
+        """Populates the MIDI port combobox. Fed from MidiPortMonitor's cached list, so it can arrive any time."""
         current_selection = self.port_combo.currentText()
         self.port_combo.blockSignals(True)
         self.port_combo.clear()
@@ -85,10 +88,24 @@ class MidiConnectionWidget(QGroupBox): # Inherit from QGroupBox for easy title
             self.port_combo.addItem("No MIDI output ports found.")
             self.port_combo.setEnabled(False)
             self.connect_button.setEnabled(False) # Can't connect if no ports
+        if self._is_connected or self._is_pending: # A hotplug refresh must not unlock the port choice mid-session
+            self.port_combo.setEnabled(False)
+            self.connect_button.setEnabled(not self._is_pending)
         self.port_combo.blockSignals(False)
 
+    def set_pending(self, is_pending: bool, description: str = ""):
+        """Locks the controls while a connect/disconnect runs; the button shows what is happening."""
+        self._is_pending = is_pending
+        if is_pending:
+            self.connect_button.setText(description.split(" ")[0] + "..." if description else "Working...")
+            self.connect_button.setEnabled(False)
+            self.port_combo.setEnabled(False)
+        else:
+            self.set_connection_status(self._is_connected, "")
+
     def set_connection_status(self, is_connected: bool, message: str):
         """Updates the UI based on connection status."""
+        self._is_connected = is_connected
         if is_connected:
             self.connect_button.setText("Disconnect")
             self.port_combo.setEnabled(False) # Don't allow port change while connected
@@ -98,6 +115,11 @@ class MidiConnectionWidget(QGroupBox): # Inherit from QGroupBox for easy title
             self.port_combo.setEnabled(self.port_combo.count() > 0 and self.port_combo.itemText(0) != "No MIDI output ports found.")
             # self.status_label.setText(f"Status: {message}")
         
+        if self._is_pending: # Final state is applied by set_pending(False)
+            self.connect_button.setEnabled(False)
+            self.port_combo.setEnabled(False)
+            return
+
         # Ensure connect button is enabled if there are valid ports and not connected
         if not is_connected and self.port_combo.isEnabled():
             self.connect_button.setEnabled(True)
@@ -41,7 +41,10 @@ except ImportError as e:
 
 # --- Import core components ---
 try:
-    from core.smartpad_controller import SmartPadController
+    from core.smartpad_controller import SmartPadController, CONNECTION_CLOSE_TIMEOUT_S
+    from core.midi_port_monitor import MidiPortMonitor
+    from core.playback_scheduler import PlaybackScheduler
+    from core.light_effects_engine import LightEffectsEngine
     from core.animation_model import SmartPadAnimationModel # MAX_ANIMATION_FRAMES removed from import
     from core.static_layout_model import StaticLayoutModel
 except ImportError as e:
@@ -61,6 +64,12 @@ class MainWindow(QMainWindow):
         self.load_settings()
 
         self._current_paint_color_name: str = DEFAULT_PAINT_COLOR_NAME
+        # Paint strokes are collected per event-loop turn (pad -> final color) and sent as one batch
+        self._pending_paint_writes: dict[int, str] = {}
+        self._paint_flush_timer = QTimer(self)
+        self._paint_flush_timer.setSingleShot(True)
+        self._paint_flush_timer.setInterval(0)
+        self._paint_flush_timer.timeout.connect(self._flush_paint_writes)
 
         script_dir = os.path.dirname(os.path.abspath(__file__)) # gui directory
         project_root_dir = os.path.dirname(os.path.abspath(__file__))
@@ -76,6 +85,11 @@ class MainWindow(QMainWindow):
         print(f"INFO: Animations directory: {self.animations_dir}")
 
         self.smartpad_controller = SmartPadController(parent=self)
+        self.smartpad_controller.delta_mode = QSettings(APP_AUTHOR_SETTINGS, APP_NAME_FULL).value("deltaOutput", False, type=bool) # Opt-in
+        self.midi_port_monitor = MidiPortMonitor(parent=self)
+        self.light_effects_engine = LightEffectsEngine(self.smartpad_controller) # Reactive effects on pad presses
+        # Port to reconnect to automatically when it (re)appears; cleared by a manual disconnect
+        self._auto_reconnect_port_name: str | None = QSettings(APP_AUTHOR_SETTINGS, APP_NAME_FULL).value("lastSmartPadPort", "", type=str) or None
         self.animation_model = SmartPadAnimationModel(parent=self)
         self.static_layout_model = StaticLayoutModel(base_storage_path=self.user_data_base_path, parent=self)
 
@@ -102,15 +116,17 @@ class MainWindow(QMainWindow):
         self._connect_signals()
 
         self.status_bar.showMessage("Ready. Please connect to SmartPad.", 5000)
-        self.midi_connection_widget.update_ports_list(self.smartpad_controller.get_available_ports())
+        self.midi_port_monitor.start() # First scan fills the port list via ports_changed
         self.color_palette_widget.set_selected_color_externally(self._current_paint_color_name)
         self.static_layout_widget.update_layouts_list(self.static_layout_model.get_available_layout_names())
         self._populate_saved_animations_combo() # New method to populate anim combo
         self._update_animation_ui_from_model()
         self._update_ui_enabled_state()
 
-        self.playback_timer = QTimer(self)
-        self.playback_timer.timeout.connect(self._on_playback_timer_tick)
+        # Frames are released to the device at precise deadlines off the GUI thread; the GUI just follows along
+        self.playback_scheduler = PlaybackScheduler(self.smartpad_controller, parent=self)
+        self.playback_scheduler.frame_released.connect(self._on_playback_frame_released)
+        self.playback_scheduler.playback_finished.connect(self._on_playback_finished)
 
 
     def _init_ui_layout_and_widgets(self):
@@ -185,6 +201,8 @@ class MainWindow(QMainWindow):
 
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.output_metrics_label = QLabel("") # Live MIDI output rate, fed by metrics_updated
+        self.status_bar.addPermanentWidget(self.output_metrics_label)
 
     def _create_actions_and_menus(self):
         # Standard Exit Action
@@ -224,14 +242,85 @@ class MainWindow(QMainWindow):
         self.file_menu.addSeparator()
         self.file_menu.addAction(self.exit_action)
 
+        # Device Menu (MIDI output options)
+        self.device_menu = self.menu_bar.addMenu("&Device")
+        self.delta_output_action = QAction("Delta Output (send changed pads only)", self)
+        self.delta_output_action.setCheckable(True)
+        self.delta_output_action.setChecked(self.smartpad_controller.delta_mode)
+        self.delta_output_action.setStatusTip("Only send MIDI for pads whose color changed since the last frame")
+        self.delta_output_action.toggled.connect(self._on_delta_output_toggled)
+        self.device_menu.addAction(self.delta_output_action)
+
+        self.calibrate_output_action = QAction("Calibrate Output Speed...", self)
+        self.calibrate_output_action.setStatusTip("Find the fastest MIDI timing this SmartPad handles and remember it for this port")
+        self.calibrate_output_action.triggered.connect(self._on_calibrate_output_triggered)
+        self.device_menu.addAction(self.calibrate_output_action)
+
+        self.direct_overwrite_action = QAction("Direct Overwrite (one message per color change)", self)
+        self.direct_overwrite_action.setCheckable(True)
+        self.direct_overwrite_action.setStatusTip("Change lit pads with a single Note On instead of Note Off + Note On (remembered per port)")
+        self.direct_overwrite_action.triggered.connect(self._on_direct_overwrite_triggered)
+        self.device_menu.addAction(self.direct_overwrite_action)
+
+        self.verify_direct_overwrite_action = QAction("Verify Direct Overwrite...", self)
+        self.verify_direct_overwrite_action.setStatusTip("Send test patterns both ways and enable direct overwrite if the device shows the same result")
+        self.verify_direct_overwrite_action.triggered.connect(self._on_verify_direct_overwrite_triggered)
+        self.device_menu.addAction(self.verify_direct_overwrite_action)
+        self.device_menu.addSeparator()
+
+        self.capture_midi_action = QAction("Capture MIDI Output to File...", self)
+        self.capture_midi_action.setCheckable(True)
+        self.capture_midi_action.setStatusTip("Record every message sent to the SmartPad, with timestamps, into a .mid file")
+        self.capture_midi_action.triggered.connect(self._on_capture_midi_triggered)
+        self.device_menu.addAction(self.capture_midi_action)
+
+        self.replay_capture_action = QAction("Replay MIDI Capture...", self)
+        self.replay_capture_action.setStatusTip("Re-send a recorded .mid capture to the connected SmartPad")
+        self.replay_capture_action.triggered.connect(self._on_replay_capture_triggered)
+        self.device_menu.addAction(self.replay_capture_action)
+
+        self.auto_reconnect_action = QAction("&Auto-Reconnect SmartPad", self)
+        self.auto_reconnect_action.setCheckable(True)
+        self.auto_reconnect_action.setChecked(QSettings(APP_AUTHOR_SETTINGS, APP_NAME_FULL).value("autoReconnect", True, type=bool))
+        self.auto_reconnect_action.setStatusTip("Reconnect automatically when the last used SmartPad port appears")
+        self.device_menu.addAction(self.auto_reconnect_action)
+
+        self.pad_effects_action = QAction("Reactive Pad &Effects", self)
+        self.pad_effects_action.setCheckable(True)
+        self.pad_effects_action.setStatusTip("Pressing pads on the SmartPad plays ripples and glows over the current frame instead of painting")
+        self.pad_effects_action.toggled.connect(self._on_pad_effects_toggled)
+        self.device_menu.addAction(self.pad_effects_action)
+
     def _connect_signals(self):
         # SmartPad Controller
         self.smartpad_controller.connection_status_changed.connect(self.on_smartpad_connection_status_changed)
         self.smartpad_controller.error_occurred.connect(lambda msg: self.status_bar.showMessage(f"MIDI Error: {msg}", 7000))
+        self.smartpad_controller.calibration_progress.connect(
+            lambda step, total, desc: self.status_bar.showMessage(f"Calibrating output ({step}/{total}): {desc}", 0)
+        )
+        self.smartpad_controller.calibration_finished.connect(self._on_calibration_finished)
+        self.smartpad_controller.direct_overwrite_verified.connect(self._on_direct_overwrite_verified)
+        self.smartpad_controller.capture_replay_finished.connect(
+            lambda sent, late_ms: self.status_bar.showMessage(f"Capture replay finished: {sent} messages (worst lateness {late_ms:.2f} ms).", 5000)
+        )
+        self.smartpad_controller.output_overrun.connect(
+            lambda predicted_ms, period_ms: self.status_bar.showMessage(
+                f"MIDI output overrun: frame needs ~{predicted_ms:.1f} ms but only {period_ms} ms is available.", 3000)
+        )
+        self.smartpad_controller.metrics_updated.connect(self._on_output_metrics_updated)
 
         # MIDI Connection Widget
-        self.midi_connection_widget.connect_requested.connect(self.smartpad_controller.connect)
-        self.midi_connection_widget.disconnect_requested.connect(self.smartpad_controller.disconnect)
+        self.midi_connection_widget.connect_requested.connect(self.smartpad_controller.connect_async)
+        self.smartpad_controller.connection_pending_changed.connect(self._on_connection_pending_changed)
+        self.smartpad_controller.reconnect_state_changed.connect(self._on_reconnect_state_changed)
+        self.smartpad_controller.pad_pressed.connect(self._on_hardware_pad_pressed) # Queued from the MIDI input thread
+        self.midi_connection_widget.disconnect_requested.connect(self._on_disconnect_requested)
+
+        # MIDI Port Monitor (hotplug)
+        self.midi_port_monitor.ports_changed.connect(self.midi_connection_widget.update_ports_list)
+        self.midi_port_monitor.ports_changed.connect(self._on_initial_ports_scanned)
+        self.midi_port_monitor.ports_added.connect(self._on_midi_ports_added)
+        self.midi_port_monitor.ports_removed.connect(self._on_midi_ports_removed)
 
         # Color Palette Widget
         self.color_palette_widget.color_selected.connect(self._on_paint_color_selected)
@@ -283,25 +372,180 @@ class MainWindow(QMainWindow):
         self.animation_controls_widget.delete_selected_frame_ctrl_requested.connect(self._on_delete_frame_requested)
         self.animation_controls_widget.frame_delay_changed.connect(self.animation_model.set_frame_delay_ms)
         self.animation_controls_widget.loop_toggle_changed.connect(self.animation_model.set_loop)
+        self.animation_controls_widget.loop_toggle_changed.connect(lambda loop: self.playback_scheduler.set_loop(loop))
 
     # --- Slot Implementations (Many existing, some new/modified) ---
     def on_smartpad_connection_status_changed(self, is_connected: bool, message: str):
         self.midi_connection_widget.set_connection_status(is_connected, message)
         if not is_connected:
-             self.midi_connection_widget.update_ports_list(self.smartpad_controller.get_available_ports())
+             self.pad_effects_action.setChecked(False)
+             self.midi_connection_widget.update_ports_list(self.midi_port_monitor.get_cached_ports())
+             self.midi_port_monitor.refresh_now()
+        else:
+            self._auto_reconnect_port_name = self.smartpad_controller.get_connected_port_name()
+        self.direct_overwrite_action.setChecked(self.smartpad_controller.direct_overwrite) # Saved per port
         
         status_prefix = "Connected to: " if is_connected else "Status: " # Adjusted prefix
         self.status_bar.showMessage(status_prefix + message, 5000)
+        profile = self.smartpad_controller.profile
+        if is_connected and (profile.grid_rows, profile.grid_cols) != (GRID_ROWS, GRID_COLS):
+            # The editor is built around the SmartPad's 8x8 grid; other layouts are driven from code (e.g. tiled canvases)
+            self.status_bar.showMessage(f"Connected to: {message} ({profile.name} is {profile.grid_rows}x{profile.grid_cols}; "
+                                        f"the editor grid is {GRID_ROWS}x{GRID_COLS})", 8000)
         if is_connected:
             self.smartpad_controller.clear_all_pads_on_device()
             # On connect, load current edit frame to hardware, or clear if no frame
             self._on_animation_model_edit_frame_changed(self.animation_model.get_current_edit_frame_index())
         self._update_ui_enabled_state()
 
+    def _on_connection_pending_changed(self, is_pending: bool, description: str):
+        self.midi_connection_widget.set_pending(is_pending, description)
+        if is_pending:
+            self.status_bar.showMessage(description, 0)
+        self._update_ui_enabled_state()
+
+    def _on_reconnect_state_changed(self, is_reconnecting: bool, description: str):
+        # The controller reopens a failed port by itself and resends the current pads; just report it
+        self.status_bar.showMessage(description, 0 if is_reconnecting else 5000)
+        self._update_ui_enabled_state()
+
+    def _on_disconnect_requested(self):
+        self._auto_reconnect_port_name = None # User chose to disconnect; don't reconnect behind their back
+        self.smartpad_controller.disconnect_async()
+
+    def _on_initial_ports_scanned(self, ports: list[str]):
+        # The remembered SmartPad may already be plugged in when the app starts
+        self.midi_port_monitor.ports_changed.disconnect(self._on_initial_ports_scanned)
+        if self._auto_reconnect_port_name in ports:
+            self._on_midi_ports_added([self._auto_reconnect_port_name])
+
+    def _on_midi_ports_added(self, port_names: list[str]):
+        if (self._auto_reconnect_port_name in port_names and self.auto_reconnect_action.isChecked()
+                and not self.smartpad_controller.is_connected() and not self.smartpad_controller.is_connection_pending()):
+            self.status_bar.showMessage(f"SmartPad '{self._auto_reconnect_port_name}' detected, reconnecting...", 3000)
+            self.smartpad_controller.connect_async(self._auto_reconnect_port_name)
+
+    def _on_midi_ports_removed(self, port_names: list[str]):
+        connected_port = self.smartpad_controller.get_connected_port_name()
+        if connected_port and connected_port in port_names:
+            # Device was unplugged: release the dead port but remember it for auto-reconnect
+            self._stop_animation_playback_if_active()
+            self.smartpad_controller.disconnect_async(turn_all_off=False)
+            self._auto_reconnect_port_name = connected_port
+            self.status_bar.showMessage(f"SmartPad '{connected_port}' was unplugged.", 5000)
+
     def _on_paint_color_selected(self, color_name: str):
         self._current_paint_color_name = color_name
         self.status_bar.showMessage(f"Paint: {color_name.title()}", 2000)
 
+    def _on_output_metrics_updated(self, metrics: dict):
+        if not self.smartpad_controller.is_connected():
+            self.output_metrics_label.setText("")
+            return
+        self.output_metrics_label.setText(
+            f"MIDI: {metrics['messages_per_second']:,.0f} msg/s · {metrics['frames_per_second']:.1f} fps · "
+            f"skipped {metrics['frames_skipped']} · errors {metrics['send_errors']}"
+        )
+
+    def _on_delta_output_toggled(self, enabled: bool):
+        self.smartpad_controller.delta_mode = enabled
+        self.smartpad_controller.invalidate_device_state() # Next frame is a full refresh either way
+        self.status_bar.showMessage(f"Delta output {'enabled' if enabled else 'disabled'}.", 2000)
+
+    def _on_calibrate_output_triggered(self):
+        if not self.smartpad_controller.is_connected():
+            self.status_bar.showMessage("Connect SmartPad to calibrate.", 3000)
+            return
+        if not self.smartpad_controller.can_report_pads():
+            # Without readback only delivery could be checked, and that passes settings the device cannot keep up with
+            self.status_bar.showMessage("This port cannot report its pad colors, so its output speed cannot be calibrated; default timing kept.", 7000)
+            return
+        self._stop_animation_playback_if_active()
+        reply = QMessageBox.question(self, "Calibrate Output Speed",
+                                     "The SmartPad will flash test patterns for a while. "
+                                     "The fastest timing that reproduces every pattern is saved for this port.\n\nStart calibration?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes and self.smartpad_controller.calibrate():
+            self.calibrate_output_action.setEnabled(False)
+            self._update_ui_enabled_state()
+
+    def _on_calibration_finished(self, success: bool, calibration: dict):
+        self.calibrate_output_action.setEnabled(True)
+        if success:
+            self.status_bar.showMessage(
+                f"Calibration saved: {calibration['inter_command_delay'] * 1000:.2f} ms gap, "
+                f"batch {calibration['burst_messages']}, ~{calibration['frame_time_ms']:.1f} ms per full frame.", 7000)
+        else:
+            self.status_bar.showMessage("Calibration cancelled or no setting passed; previous settings kept.", 5000)
+        self._update_ui_enabled_state()
+        if self.smartpad_controller.is_connected(): # Put the edited frame back on the device
+            self._on_animation_model_edit_frame_changed(self.animation_model.get_current_edit_frame_index())
+
+    def _on_direct_overwrite_triggered(self, checked: bool):
+        if not self.smartpad_controller.set_direct_overwrite(checked): # Only for the connected port
+            self.direct_overwrite_action.setChecked(self.smartpad_controller.direct_overwrite)
+            return
+        self.smartpad_controller.invalidate_device_state()
+        self.status_bar.showMessage(f"Direct overwrite {'enabled' if checked else 'disabled'} for this port.", 3000)
+
+    def _on_verify_direct_overwrite_triggered(self):
+        if not self.smartpad_controller.is_connected():
+            self.status_bar.showMessage("Connect SmartPad to verify direct overwrite.", 3000)
+            return
+        self._stop_animation_playback_if_active()
+        if self.smartpad_controller.verify_direct_overwrite():
+            self.verify_direct_overwrite_action.setEnabled(False)
+            self.calibrate_output_action.setEnabled(False)
+            self._update_ui_enabled_state()
+
+    def _on_direct_overwrite_verified(self, supported: bool, results: dict):
+        self.verify_direct_overwrite_action.setEnabled(True)
+        self.calibrate_output_action.setEnabled(True)
+        self.direct_overwrite_action.setChecked(self.smartpad_controller.direct_overwrite)
+        if not results:
+            self.status_bar.showMessage("Direct overwrite check cancelled; previous setting kept.", 5000)
+        elif supported:
+            self.status_bar.showMessage(
+                f"Direct overwrite works on this port and is now on: {results['direct_messages_per_frame']:.0f} instead of "
+                f"{results['paired_messages_per_frame']:.0f} messages per full frame.", 7000)
+        else:
+            self.status_bar.showMessage("Direct overwrite did not reproduce the test frames on this port; it stays off.", 7000)
+        self._update_ui_enabled_state()
+        if self.smartpad_controller.is_connected(): # Put the edited frame back on the device
+            self._on_animation_model_edit_frame_changed(self.animation_model.get_current_edit_frame_index())
+
+    def _on_capture_midi_triggered(self, checked: bool):
+        if not checked:
+            filepath = self.smartpad_controller.stop_capture()
+            if filepath:
+                self.status_bar.showMessage(f"MIDI capture saved to '{os.path.basename(filepath)}'.", 5000)
+            return
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Capture MIDI Output To", os.path.join(self.user_data_base_path, "midi_capture.mid"), "MIDI Files (*.mid)"
+        )
+        if filepath and self.smartpad_controller.start_capture(filepath):
+            self.status_bar.showMessage(f"Capturing MIDI output to '{os.path.basename(filepath)}'...", 5000)
+        else:
+            self.capture_midi_action.setChecked(False)
+
+    def _on_replay_capture_triggered(self):
+        if not self.smartpad_controller.is_connected():
+            self.status_bar.showMessage("Connect SmartPad to replay a capture.", 3000)
+            return
+        filepath, _ = QFileDialog.getOpenFileName(self, "Replay MIDI Capture", self.user_data_base_path, "MIDI Files (*.mid)")
+        if not filepath:
+            return
+        self._stop_animation_playback_if_active()
+        reply = QMessageBox.question(self, "Replay Speed",
+                                     "Replay with the original timing?\n\nChoose 'No' to send it as fast as possible.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
+                                     QMessageBox.StandardButton.Yes)
+        if reply == QMessageBox.StandardButton.Cancel:
+            return
+        if self.smartpad_controller.replay_capture(filepath, max_speed=(reply == QMessageBox.StandardButton.No)):
+            self.status_bar.showMessage(f"Replaying '{os.path.basename(filepath)}'...", 0)
+
     def _on_pad_grid_interaction(self, pad_index_0_63: int, mouse_button: Qt.MouseButton):
         if not self.smartpad_controller.is_connected() or self.animation_model.get_is_playing(): # Prevent edit while playing
             if not self.smartpad_controller.is_connected():
@@ -314,10 +558,40 @@ class MainWindow(QMainWindow):
         
         row, col = pad_index_0_63 // GRID_COLS, pad_index_0_63 % GRID_COLS
         self.pad_grid_widget.update_pad_gui_color(row, col, target_color_name)
-        self.smartpad_controller.set_pad_color_by_name(pad_index_0_63, target_color_name, silent=True) # Silent for speed
+        self._pending_paint_writes[pad_index_0_63] = target_color_name
+        if not self._paint_flush_timer.isActive():
+            self._paint_flush_timer.start()
         if self.animation_model.get_current_edit_frame_index() != -1:
             self.animation_model.update_pad_in_current_edit_frame(pad_index_0_63, target_color_name)
 
+    def _on_hardware_pad_pressed(self, pad_index: int, velocity: int):
+        # Pressing a pad on the device paints it like a left click; the write is flushed
+        # on the next event loop pass, well within a frame. With effects on, the engine gets presses instead.
+        # Like clicks, presses are ignored while the grid is disabled (calibration, pending connect, playback).
+        if not self.pad_grid_widget.isEnabled() or self.light_effects_engine.is_running():
+            return
+        if pad_index < GRID_ROWS * GRID_COLS:
+            self._on_pad_grid_interaction(pad_index, Qt.MouseButton.LeftButton)
+
+    def _flush_paint_writes(self):
+        pending, self._pending_paint_writes = self._pending_paint_writes, {}
+        if not pending or not self.smartpad_controller.is_connected():
+            return
+        self.smartpad_controller.set_pads(pending, silent=True) # One batch per stroke segment
+        if self.light_effects_engine.is_running():
+            self.light_effects_engine.set_base_frame(self.pad_grid_widget.get_current_grid_data_names())
+
+    def _on_pad_effects_toggled(self, enabled: bool):
+        if not enabled:
+            self.light_effects_engine.stop()
+            return
+        if not self.smartpad_controller.is_connected() or self.animation_model.get_is_playing():
+            self.status_bar.showMessage("Connect SmartPad and stop playback to use pad effects.", 3000)
+            self.pad_effects_action.setChecked(False)
+            return
+        self.light_effects_engine.start(self.pad_grid_widget.get_current_grid_data_names())
+        self.status_bar.showMessage("Reactive pad effects on: press pads on the SmartPad.", 3000)
+
     def _clear_current_grid_and_model_frame(self):
         self.pad_grid_widget.clear_all_pads_gui()
         current_edit_idx = self.animation_model.get_current_edit_frame_index()
@@ -406,6 +680,7 @@ class MainWindow(QMainWindow):
                 self.pad_grid_widget.update_grid_from_data(frame_data)
                 if self.smartpad_controller.is_connected():
                     self.smartpad_controller.set_all_pads_from_color_names(frame_data, silent=True)
+                    self.light_effects_engine.set_base_frame(frame_data)
             else:
                 self.pad_grid_widget.clear_all_pads_gui()
         else:
@@ -420,11 +695,29 @@ class MainWindow(QMainWindow):
     def _on_animation_model_playback_state_changed(self, is_playing: bool):
         self.animation_controls_widget.update_playback_button_ui(is_playing)
         if is_playing:
-            self.status_bar.showMessage("Animation Playing...", 0)
-            self.playback_timer.start(self.animation_model.frame_delay_ms)
+            self.pad_effects_action.setChecked(False) # Playback owns the pads
+            # Cap playback speed at what the MIDI output can actually deliver (per the controller's model)
+            frame_delay_ms = self.animation_model.frame_delay_ms
+            min_delay_ms = self.smartpad_controller.min_frame_delay_ms()
+            if min_delay_ms > frame_delay_ms:
+                frame_delay_ms = min_delay_ms
+                self.status_bar.showMessage(f"Animation Playing... (capped at {frame_delay_ms} ms/frame by MIDI output budget)", 0)
+            else:
+                self.status_bar.showMessage("Animation Playing...", 0)
+            self.smartpad_controller.set_frame_period_ms(frame_delay_ms)
+            frames = [self.animation_model.get_frame_object(i).get_all_color_names()
+                      for i in range(self.animation_model.get_frame_count())]
+            self.playback_scheduler.start(frames, frame_delay_ms, self.animation_model.loop,
+                                          self.animation_model.get_current_playback_frame_index())
         else:
-            self.playback_timer.stop()
-            if self.animation_model.get_current_playback_frame_index() == 0 and not self.playback_timer.isActive():
+            if self.playback_scheduler.is_running():
+                self.playback_scheduler.stop()
+                timing = self.playback_scheduler.get_timing_stats()
+                print(f"INFO: Playback timing: {timing['frames_released']} frames, mean error "
+                      f"{timing['mean_abs_error_ms']:.2f} ms, max {timing['max_abs_error_ms']:.2f} ms, "
+                      f"{timing['slots_skipped']} slot(s) skipped")
+            self.smartpad_controller.set_frame_period_ms(0)
+            if self.animation_model.get_current_playback_frame_index() == 0:
                 self.status_bar.showMessage("Animation Stopped.", 3000)
                 self._on_animation_model_edit_frame_changed(self.animation_model.get_current_edit_frame_index())
             else:
@@ -433,7 +726,7 @@ class MainWindow(QMainWindow):
 
     # --- Animation Control Slots & Animation Studio Button Slots ---
     def _stop_animation_playback_if_active(self):
-        if self.animation_model.get_is_playing() or self.playback_timer.isActive():
+        if self.animation_model.get_is_playing() or self.playback_scheduler.is_running():
             self.animation_model.stop_playback()
 
     def _on_play_animation(self):
@@ -477,41 +770,35 @@ class MainWindow(QMainWindow):
         else:
             self.status_bar.showMessage("No frame selected to delete.", 2000)
 
-    # In MainWindow
-    def _on_playback_timer_tick(self):
-        if not self.animation_model.get_is_playing() or not self.smartpad_controller.is_connected():
-            self.animation_model.stop_playback() 
+    def _on_playback_frame_released(self, frame_index: int, timing_error_ms: float):
+        # Queued from the scheduler thread; the frame has already been handed to the controller
+        if not self.animation_model.get_is_playing():
+            return # Arrived after playback was paused/stopped
+        if not self.smartpad_controller.is_connected():
+            self.animation_model.stop_playback()
             return
+        self.animation_model.mark_playback_frame_played(frame_index)
+        frame_obj = self.animation_model.get_frame_object(frame_index)
+        if frame_obj:
+            colors = frame_obj.get_all_color_names()
+            self.pad_grid_widget.update_grid_from_data(colors)
 
-        current_playback_frame_index_before_step = self.animation_model.get_current_playback_frame_index() # Get index before stepping
-        colors = self.animation_model.step_and_get_playback_frame_colors()
-        
-        # print(f"DEBUG MW: Playback Tick. Frame Index (just played): {current_playback_frame_index_before_step}. Colors to display: {str(colors)[:100]}...") # Print first few colors
-
-        if colors:
-            self.pad_grid_widget.update_grid_from_data(colors) 
-            # print(f"DEBUG MW: About to call set_all_pads_from_color_names for frame {current_playback_frame_index_before_step}")
-            self.smartpad_controller.set_all_pads_from_color_names(colors, silent=False) # <<<< TEMPORARILY SET silent=False
-            
             all_frames_color_data = []
             for i in range(self.animation_model.get_frame_count()):
                 frame_obj = self.animation_model.get_frame_object(i)
                 if frame_obj: all_frames_color_data.append(frame_obj.get_all_color_names())
                 else: all_frames_color_data.append([DEFAULT_PAD_COLOR_ON_GRID_MAIN] * (GRID_ROWS*GRID_COLS))
 
-            # Determine which frame index to highlight as "just played"
-            # If playback_frame_index has already advanced for the *next* frame, then current_playback_frame_index_before_step is correct.
-            playback_highlight_idx = current_playback_frame_index_before_step
-
             self.animation_timeline_widget.update_frames_display(
                 all_frames_color_data,
                 self.animation_model.get_current_edit_frame_index(),
-                playback_highlight_idx # Highlight the frame that was just displayed
+                frame_index # Highlight the frame that was just displayed
             )
-        
-        if not self.animation_model.get_is_playing(): 
-            self.playback_timer.stop()
-            self._on_animation_model_playback_state_changed(False)
+
+    def _on_playback_finished(self):
+        # Non-looping animation played its last frame; leave it on screen, like a pause
+        if self.animation_model.get_is_playing():
+            self.animation_model.pause_playback()
         
 
     # --- Animation File Operations (New Animation Studio Buttons) ---
@@ -703,8 +990,11 @@ class MainWindow(QMainWindow):
         has_frames = self.animation_model.get_frame_count() > 0
         frame_selected = self.animation_model.get_current_edit_frame_index() != -1
 
-        can_edit_globally = is_connected and not is_playing
+        can_edit_globally = (is_connected and not is_playing and not self.smartpad_controller.is_calibrating()
+                             and not self.smartpad_controller.is_connection_pending())
         
+        # Direct overwrite is a per-port setting: nothing to change while disconnected
+        self.direct_overwrite_action.setEnabled(is_connected and not self.smartpad_controller.is_calibrating())
         self.color_palette_widget.setEnabled(can_edit_globally)
         self.pad_grid_widget.setEnabled(can_edit_globally)
         self.static_layout_widget.set_controls_enabled(can_edit_globally)
@@ -731,6 +1021,9 @@ class MainWindow(QMainWindow):
         settings = QSettings(APP_AUTHOR_SETTINGS, APP_NAME_FULL)
         settings.setValue("geometry", self.saveGeometry())
         settings.setValue("windowState", self.saveState())
+        settings.setValue("deltaOutput", self.smartpad_controller.delta_mode)
+        settings.setValue("autoReconnect", self.auto_reconnect_action.isChecked())
+        settings.setValue("lastSmartPadPort", self._auto_reconnect_port_name or "")
 
     def load_settings(self):
         settings = QSettings(APP_AUTHOR_SETTINGS, APP_NAME_FULL)
@@ -745,8 +1038,14 @@ class MainWindow(QMainWindow):
             event.ignore()
             return
         self._stop_animation_playback_if_active()
-        if self.smartpad_controller and self.smartpad_controller.is_connected():
-            self.smartpad_controller.disconnect(turn_all_off=True)
+        self.light_effects_engine.stop(restore=False)
+        # Closing is bounded: a hung MIDI backend is left to its daemon thread rather than delaying exit
+        self.midi_port_monitor.stop()
+        if self.smartpad_controller.wait_for_connection_operation(CONNECTION_CLOSE_TIMEOUT_S) and self.smartpad_controller.is_connected():
+            self.smartpad_controller.disconnect_async(turn_all_off=True)
+            if not self.smartpad_controller.wait_for_connection_operation(CONNECTION_CLOSE_TIMEOUT_S):
+                print("Warning: MIDI port did not close in time; exiting anyway.")
+        self.smartpad_controller.shutdown()
         self.save_settings()
         super().closeEvent(event)
 